@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
+from app.api.core.metrics import admission_queue_wait_seconds, http_requests_shed_total
+
+logger = logging.getLogger(__name__)
+
+ADMITTED_PREFIXES = ("/api/v1/customers", "/api/v1/orders", "/api/v1/reports")
+# Long-lived streams would hold a slot for their whole lifetime.
+STREAMING_PATHS = ("/api/v1/orders/export",)
+READ_POSTS = ("/api/v1/customers/lookup",)
+
+class EventLoopLagMonitor:
+    def __init__(self, interval_seconds: float = 0.1):
+        self.interval_seconds = interval_seconds
+        self.lag_seconds = 0.0
+        self._task: asyncio.Task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._measure(), name="event-loop-lag-monitor")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self.lag_seconds = 0.0
+
+    async def _measure(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            self.lag_seconds = max(0.0, loop.time() - expected)
+
+class RouteGroup:
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit) if limit > 0 else None
+
+    async def acquire(self, timeout: float) -> bool:
+        if self._semaphore is None:
+            self.active += 1
+            return True
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    def stats(self):
+        return {"limit": self.limit, "active": self.active, "waiting": self.waiting}
+
+class AdmissionController:
+    def __init__(
+        self,
+        read_limit: int = 200,
+        write_limit: int = 100,
+        order_create_limit: int = 50,
+        max_queue_wait_ms: float = 250.0,
+        max_loop_lag_ms: float = 200.0,
+        max_pool_waiters: int = 100,
+        retry_after_seconds: int = 1,
+        unready_after_seconds: float = 5.0,
+        lag_monitor: EventLoopLagMonitor = None,
+        pool_waiters: Callable[[], int] = None,
+    ):
+        self.groups = {
+            "reads": RouteGroup("reads", read_limit),
+            "writes": RouteGroup("writes", write_limit),
+            "order_create": RouteGroup("order_create", order_create_limit),
+        }
+        self.max_queue_wait_seconds = max_queue_wait_ms / 1000
+        self.max_loop_lag_seconds = max_loop_lag_ms / 1000
+        self.max_pool_waiters = max_pool_waiters
+        self.retry_after_seconds = retry_after_seconds
+        self.unready_after_seconds = unready_after_seconds
+        self.lag_monitor = lag_monitor or EventLoopLagMonitor()
+        self.pool_waiters = pool_waiters or (lambda: 0)
+        self.shed_until = 0.0
+        self.shed_since = 0.0
+
+    def group_for(self, method: str, path: str) -> Optional[RouteGroup]:
+        path = path.rstrip("/")
+        if not path.startswith(ADMITTED_PREFIXES) or path.endswith("/events") or path in STREAMING_PATHS:
+            return None
+        if method in ("GET", "HEAD") or (method == "POST" and path in READ_POSTS):
+            return self.groups["reads"]
+        if method == "POST" and path == "/api/v1/orders":
+            return self.groups["order_create"]
+        return self.groups["writes"]
+
+    def overload_reason(self) -> Optional[str]:
+        if self.lag_monitor.lag_seconds > self.max_loop_lag_seconds:
+            return "event_loop_lag"
+        if self.max_pool_waiters > 0 and self.pool_waiters() > self.max_pool_waiters:
+            return "mongo_pool"
+        return None
+
+    def _shed(self, group: RouteGroup, reason: str):
+        now = time.monotonic()
+        if now >= self.shed_until:
+            self.shed_since = now
+        self.shed_until = now + self.retry_after_seconds
+        http_requests_shed_total.inc(group.name, reason)
+        logger.warning("Shedding %s request: %s", group.name, reason)
+
+    async def admit(self, group: RouteGroup) -> bool:
+        reason = self.overload_reason()
+        if reason is not None:
+            self._shed(group, reason)
+            return False
+
+        start = time.perf_counter()
+        admitted = await group.acquire(self.max_queue_wait_seconds)
+        admission_queue_wait_seconds.observe(time.perf_counter() - start, group.name)
+        if not admitted:
+            self._shed(group, "queue_wait")
+        return admitted
+
+    def status(self):
+        now = time.monotonic()
+        shedding = now < self.shed_until
+        shedding_seconds = now - self.shed_since if shedding else 0.0
+        return {
+            # Only sustained shedding takes the instance out of rotation; brief spikes would make it flap.
+            "ready": not shedding or shedding_seconds < self.unready_after_seconds,
+            "overload": self.overload_reason(),
+            "shedding": shedding,
+            "shedding_seconds": round(shedding_seconds, 3),
+            "event_loop_lag_ms": round(self.lag_monitor.lag_seconds * 1000, 3),
+            "mongo_pool_waiters": self.pool_waiters(),
+            "groups": {name: group.stats() for name, group in self.groups.items()},
+        }
+
+class AdmissionMiddleware:
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        group = self.controller.group_for(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.controller.admit(group):
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"retry-after", str(self.controller.retry_after_seconds).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": b'{"detail":"Service overloaded, retry later."}'})
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            group.release()
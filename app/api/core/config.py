@@ -1,29 +1,102 @@
 from pydantic_settings import BaseSettings
+from typing import Optional
 import logging
+from app.api.core.log_config import setup_logging
 
 class Settings(BaseSettings):
     mongodb_url: str
     mongodb_db: str
     africastalking_username: str
     africastalking_api_key: str
-    docker_username: str
-    docker_password:str
-    docker_registry:str
-    docker_access_token:str
-    on_render_api_key: str
-    on_render_service_id: str
-    port: str
+    host: str = "0.0.0.0"
+    port: int = 8000
+    web_concurrency: int = 0
+    graceful_shutdown_seconds: float = 20.0
 
+    log_level: str = "INFO"
+    log_levels: str = ""
+    log_success_sample_rate: float = 1.0
+    log_json: bool = True
+
+    mongodb_max_pool_size: int = 100
+    mongodb_min_pool_size: int = 0
+    mongodb_max_idle_time_ms: Optional[int] = 60000
+    mongodb_connect_timeout_ms: int = 20000
+    mongodb_server_selection_timeout_ms: int = 30000
+    mongodb_socket_timeout_ms: Optional[int] = None
+    mongodb_wait_queue_timeout_ms: Optional[int] = None
+    mongodb_connection_budget: int = 0
+
+    sms_queue_maxsize: int = 1000
+    sms_workers: int = 4
+    sms_max_retries: int = 3
+    sms_retry_backoff_seconds: float = 0.5
+    sms_drain_timeout_seconds: float = 10.0
+    sms_provider: str = "africastalking"
+    sms_api_url: Optional[str] = None
+    sms_sender_id: Optional[str] = None
+    sms_connect_timeout_seconds: float = 2.0
+    sms_timeout_seconds: float = 5.0
+    sms_max_connections: int = 20
+    sms_batch_size: int = 100
+    sms_circuit_failure_threshold: int = 5
+    sms_circuit_reset_seconds: float = 30.0
+
+    outbox_batch_size: int = 100
+    outbox_poll_interval_seconds: float = 1.0
+    outbox_lease_seconds: float = 60.0
+    outbox_max_attempts: int = 10
+    outbox_retry_backoff_seconds: float = 5.0
+    outbox_max_outstanding: int = 500
+    outbox_retention_seconds: int = 7 * 24 * 60 * 60
+
+    customer_cache_size: int = 10000
+    customer_cache_ttl_seconds: float = 60.0
+    customer_cache_change_stream: bool = False
+
+    order_write_coalescing: bool = False
+    order_write_window_ms: float = 3.0
+    order_write_max_batch: int = 100
+
+    bulk_chunk_size: int = 1000
+    export_batch_size: int = 1000
+
+    idempotency_ttl_seconds: int = 24 * 60 * 60
+    idempotency_lease_seconds: float = 30.0
+    idempotency_wait_seconds: float = 10.0
+
+    admission_read_limit: int = 200
+    admission_write_limit: int = 100
+    admission_order_create_limit: int = 50
+    admission_max_queue_wait_ms: float = 250.0
+    admission_max_loop_lag_ms: float = 200.0
+    admission_max_pool_waiters: int = 100
+    admission_retry_after_seconds: int = 1
+    admission_unready_after_seconds: float = 5.0
+
+    order_events_queue_size: int = 100
+    order_events_heartbeat_seconds: float = 15.0
+
+    order_archive_enabled: bool = False
+    order_archive_age_seconds: int = 90 * 24 * 60 * 60
+    order_archive_batch_size: int = 500
+    order_archive_max_orders_per_second: float = 1000.0
+    order_archive_interval_seconds: float = 60 * 60
+
+    index_build_in_background: bool = True
+    index_build_retry_seconds: float = 5.0
 
     class Config:
         env_file = ".env"
-        extra = "forbid"
+        extra = "ignore"
 
 settings = Settings()
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(levelname)s ->  %(message)s -> %(asctime)s -> %(name)s',
+log_listener = setup_logging(
+    settings.log_level,
+    settings.log_levels,
+    settings.log_success_sample_rate,
+    settings.log_json,
 )
 
-logger = logging.getLogger(__name__)
\ No newline at end of file
+logger = logging.getLogger(__name__)
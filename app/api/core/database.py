@@ -1,8 +1,154 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+import logging
+import threading
+from pymongo import monitoring
+from pymongo.errors import OperationFailure
 from app.api.core.config import settings
+from app.api.core.metrics import mongo_command_metrics
 
-client = AsyncIOMotorClient(settings.mongodb_url)
-db = client[settings.mongodb_db]
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._servers = {}
 
-async def initialize_database():
+    def _server(self, address):
+        key = f"{address[0]}:{address[1]}"
+        if key not in self._servers:
+            self._servers[key] = {
+                "open": 0,
+                "checked_out": 0,
+                "max_checked_out": 0,
+                "waiting": 0,
+                "max_waiting": 0,
+                "checkouts": 0,
+                "checkout_failures": 0,
+                "cleared": 0,
+            }
+        return self._servers[key]
+
+    def pool_created(self, event):
+        with self._lock:
+            self._server(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._server(event.address)["cleared"] += 1
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._servers.pop(f"{event.address[0]}:{event.address[1]}", None)
+
+    def connection_created(self, event):
+        with self._lock:
+            self._server(event.address)["open"] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self._server(event.address)["open"] -= 1
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["waiting"] += 1
+            server["max_waiting"] = max(server["max_waiting"], server["waiting"])
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["waiting"] -= 1
+            server["checkout_failures"] += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            server = self._server(event.address)
+            server["waiting"] -= 1
+            server["checked_out"] += 1
+            server["checkouts"] += 1
+            server["max_checked_out"] = max(server["max_checked_out"], server["checked_out"])
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self._server(event.address)["checked_out"] -= 1
+
+    def waiting(self) -> int:
+        with self._lock:
+            return sum(server["waiting"] for server in self._servers.values())
+
+    def snapshot(self):
+        with self._lock:
+            servers = {address: dict(stats) for address, stats in self._servers.items()}
+
+        return {
+            "max_pool_size": settings.mongodb_max_pool_size,
+            "min_pool_size": settings.mongodb_min_pool_size,
+            "servers": servers,
+        }
+
+logger = logging.getLogger(__name__)
+
+ILLEGAL_OPERATION = 20
+
+pool_stats = PoolStatsListener()
+client = None
+db = None
+transactions_supported = True
+
+def connect_to_mongo():
+    global client, db
+    if client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        options = {
+            "maxPoolSize": settings.mongodb_max_pool_size,
+            "minPoolSize": settings.mongodb_min_pool_size,
+            "maxIdleTimeMS": settings.mongodb_max_idle_time_ms,
+            "connectTimeoutMS": settings.mongodb_connect_timeout_ms,
+            "serverSelectionTimeoutMS": settings.mongodb_server_selection_timeout_ms,
+            "socketTimeoutMS": settings.mongodb_socket_timeout_ms,
+            "waitQueueTimeoutMS": settings.mongodb_wait_queue_timeout_ms,
+        }
+        client = AsyncIOMotorClient(
+            settings.mongodb_url,
+            event_listeners=[pool_stats, mongo_command_metrics],
+            **{key: value for key, value in options.items() if value is not None},
+        )
+        db = client[settings.mongodb_db]
+    return db
+
+def close_mongo_connection():
+    global client, db
+    if client is not None:
+        client.close()
+    client = None
+    db = None
+
+async def run_in_transaction(client, callback):
+    global transactions_supported
+    if transactions_supported:
+        try:
+            async with await client.start_session() as session:
+                return await session.with_transaction(callback)
+        except OperationFailure as e:
+            if e.code != ILLEGAL_OPERATION:
+                raise
+            transactions_supported = False
+            logger.warning("MongoDB does not support transactions (%s). Falling back to separate writes; run a replica set to make them atomic.", e)
+    return await callback(None)
+
+async def initialize_database(db):
     await db.customers.create_index("email_address", unique=True)
+    await db.customers.create_index([("name_lower", 1), ("_id", 1)])
+    await db.customers.create_index([("phone_number", 1), ("_id", 1)])
+    await db.customers.create_index([("full_name", "text")], default_language="none")
+    await db.orders.create_index([("created_at", -1), ("_id", -1)])
+    await db.orders.create_index([("customer_id", 1), ("created_at", -1), ("_id", -1)])
+    await db.orders.create_index([("status", 1), ("created_at", -1), ("_id", -1)])
+    await db.outbox.create_index([("status", 1), ("next_attempt_at", 1)])
+    await db.outbox.create_index("sent_at", expireAfterSeconds=settings.outbox_retention_seconds)
+    await db.idempotency_keys.create_index("key", unique=True)
+    await db.idempotency_keys.create_index("created_at", expireAfterSeconds=settings.idempotency_ttl_seconds)
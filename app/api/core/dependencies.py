@@ -0,0 +1,103 @@
+from fastapi import FastAPI, Request
+from starlette.requests import HTTPConnection
+from app.api.core.config import settings
+from app.api.services.archive_service import OrderArchiver
+from app.api.services.cache_service import ChangeStreamInvalidator, TTLCache
+from app.api.services.circuit_breaker import CircuitBreaker
+from app.api.services.customer_service import CustomerService
+from app.api.services.idempotency_service import IdempotencyService
+from app.api.services.order_service import OrderService
+from app.api.services.order_events import OrderEventHub
+from app.api.services.outbox_service import OutboxService
+from app.api.services.sms_dispatch_service import SMSDispatchService
+from app.api.services.sms_providers import AfricasTalkingProvider, AfricasTalkingSDKProvider, SMSProvider
+from app.api.services.stats_service import StatsService
+from app.api.services.write_coalescer import WriteCoalescer
+
+def create_sms_provider() -> SMSProvider:
+    breaker = CircuitBreaker("sms", settings.sms_circuit_failure_threshold, settings.sms_circuit_reset_seconds)
+    if settings.sms_provider == "africastalking_sdk":
+        from app.api.services.sms_alert_service import SMSAlertService
+
+        return AfricasTalkingSDKProvider(SMSAlertService(settings.africastalking_username, settings.africastalking_api_key), breaker)
+    if settings.sms_provider != "africastalking":
+        raise ValueError(f"Unknown SMS_PROVIDER {settings.sms_provider!r}")
+    return AfricasTalkingProvider(
+        settings.africastalking_username,
+        settings.africastalking_api_key,
+        base_url=settings.sms_api_url,
+        sender_id=settings.sms_sender_id,
+        connect_timeout_seconds=settings.sms_connect_timeout_seconds,
+        timeout_seconds=settings.sms_timeout_seconds,
+        max_connections=settings.sms_max_connections,
+        breaker=breaker,
+    )
+
+def create_services(app: FastAPI, db):
+    app.state.sms_provider = create_sms_provider()
+    app.state.sms_dispatcher = SMSDispatchService(
+        app.state.sms_provider,
+        workers=settings.sms_workers,
+        maxsize=settings.sms_queue_maxsize,
+        max_retries=settings.sms_max_retries,
+        retry_backoff_seconds=settings.sms_retry_backoff_seconds,
+        batch_size=settings.sms_batch_size,
+    )
+    app.state.outbox_service = OutboxService(
+        db,
+        app.state.sms_dispatcher,
+        batch_size=settings.outbox_batch_size,
+        poll_interval_seconds=settings.outbox_poll_interval_seconds,
+        lease_seconds=settings.outbox_lease_seconds,
+        max_attempts=settings.outbox_max_attempts,
+        retry_backoff_seconds=settings.outbox_retry_backoff_seconds,
+        max_outstanding=settings.outbox_max_outstanding,
+    )
+    customer_cache = None
+    app.state.customer_cache_invalidator = None
+    if settings.customer_cache_size > 0:
+        customer_cache = TTLCache(settings.customer_cache_size, settings.customer_cache_ttl_seconds)
+        if settings.customer_cache_change_stream:
+            app.state.customer_cache_invalidator = ChangeStreamInvalidator(db.customers, customer_cache)
+    app.state.customer_service = CustomerService(db, customer_cache)
+    app.state.order_writer = None
+    if settings.order_write_coalescing:
+        app.state.order_writer = WriteCoalescer(db.orders, settings.order_write_window_ms, settings.order_write_max_batch)
+    app.state.stats_service = StatsService(db)
+    app.state.order_service = OrderService(
+        db,
+        app.state.outbox_service,
+        app.state.customer_service,
+        app.state.order_writer,
+        app.state.stats_service,
+    )
+    app.state.order_archiver = None
+    if settings.order_archive_enabled:
+        app.state.order_archiver = OrderArchiver(
+            db,
+            age_seconds=settings.order_archive_age_seconds,
+            batch_size=settings.order_archive_batch_size,
+            max_orders_per_second=settings.order_archive_max_orders_per_second,
+            interval_seconds=settings.order_archive_interval_seconds,
+        )
+    app.state.order_events = OrderEventHub(db.orders, queue_size=settings.order_events_queue_size)
+    app.state.idempotency_service = IdempotencyService(
+        db,
+        lease_seconds=settings.idempotency_lease_seconds,
+        wait_seconds=settings.idempotency_wait_seconds,
+    )
+
+def get_customer_service(request: Request) -> CustomerService:
+    return request.app.state.customer_service
+
+def get_order_service(request: Request) -> OrderService:
+    return request.app.state.order_service
+
+def get_stats_service(request: Request) -> StatsService:
+    return request.app.state.stats_service
+
+def get_idempotency_service(request: Request) -> IdempotencyService:
+    return request.app.state.idempotency_service
+
+def get_order_events(connection: HTTPConnection) -> OrderEventHub:
+    return connection.app.state.order_events
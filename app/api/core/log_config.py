@@ -0,0 +1,84 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+from datetime import datetime, timezone
+
+SAMPLED = {"sampled": True}
+
+_RESERVED = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "sampled"}
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render message args and tracebacks now; they may change or go away before the listener runs.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class SuccessSampler(logging.Filter):
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1 or not getattr(record, "sampled", False):
+            return True
+        return random.random() < self.rate
+
+def parse_log_levels(levels: str) -> dict:
+    parsed = {}
+    for entry in levels.split(","):
+        if "=" in entry:
+            name, level = entry.split("=", 1)
+            parsed[name.strip()] = level.strip().upper()
+    return parsed
+
+def setup_logging(level: str = "INFO", levels: str = "", sample_rate: float = 1.0, json_format: bool = True):
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SuccessSampler(sample_rate))
+
+    stream_handler = logging.StreamHandler()
+    if json_format:
+        stream_handler.setFormatter(JSONFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter('%(levelname)s ->  %(message)s -> %(asctime)s -> %(name)s'))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level.upper())
+    for name, module_level in parse_log_levels(levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_logging, listener)
+    return listener
+
+def stop_logging(listener: logging.handlers.QueueListener):
+    if listener._thread is not None:
+        listener.stop()
@@ -0,0 +1,190 @@
+import bisect
+import threading
+import time
+
+from pymongo import monitoring
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in values.items():
+            yield self.name, dict(zip(self.labelnames, labels)), value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_labels(labels)} {value}")
+        return lines
+
+class Gauge:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in values.items():
+            lines.append(f"{self.name}{_labels(dict(zip(self.labelnames, labels)))} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets or (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: ([*counts], total, count) for labels, (counts, total, count) in self._series.items()}
+        for labels, (counts, total, count) in series.items():
+            label_dict = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_labels({**label_dict, 'le': bound})} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels({**label_dict, 'le': '+Inf'})} {count}")
+            lines.append(f"{self.name}_sum{_labels(label_dict)} {total}")
+            lines.append(f"{self.name}_count{_labels(label_dict)} {count}")
+        return lines
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+http_requests_total = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by method, route and status code.", ("method", "route", "status"),
+))
+http_request_duration_seconds = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route.", ("method", "route"),
+))
+mongo_command_duration_seconds = REGISTRY.register(Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by collection and command.", ("collection", "command"),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+))
+mongo_command_errors_total = REGISTRY.register(Counter(
+    "mongo_command_errors_total", "Failed MongoDB commands by collection and command.", ("collection", "command"),
+))
+sms_send_duration_seconds = REGISTRY.register(Histogram(
+    "sms_send_duration_seconds", "SMS provider call latency by outcome.", ("outcome",),
+))
+
+http_requests_shed_total = REGISTRY.register(Counter(
+    "http_requests_shed_total", "Requests rejected by admission control by route group and reason.", ("group", "reason"),
+))
+admission_queue_wait_seconds = REGISTRY.register(Histogram(
+    "admission_queue_wait_seconds", "Time spent waiting for an admission slot by route group.", ("group",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+))
+app_startup_seconds = REGISTRY.register(Gauge(
+    "app_startup_seconds", "Seconds from the start of the app import until each startup phase completed.", ("phase",),
+))
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            route = scope.get("route")
+            path = route.path_format if route is not None else "unmatched"
+            http_requests_total.inc(scope["method"], path, str(status))
+            http_request_duration_seconds.observe(duration, scope["method"], path)
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collections = {}
+
+    def started(self, event):
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        else:
+            collection = event.command.get(event.command_name)
+        with self._lock:
+            self._collections[(event.request_id, event.connection_id)] = collection if isinstance(collection, str) else ""
+
+    def _finish(self, event):
+        with self._lock:
+            return self._collections.pop((event.request_id, event.connection_id), "")
+
+    def succeeded(self, event):
+        collection = self._finish(event)
+        mongo_command_duration_seconds.observe(event.duration_micros / 1_000_000, collection, event.command_name)
+
+    def failed(self, event):
+        collection = self._finish(event)
+        mongo_command_duration_seconds.observe(event.duration_micros / 1_000_000, collection, event.command_name)
+        mongo_command_errors_total.inc(collection, event.command_name)
+
+mongo_command_metrics = MongoCommandMetrics()
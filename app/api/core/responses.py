@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+import orjson
+from bson import Decimal128, ObjectId
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+def bson_default(value):
+    if isinstance(value, BaseModel):
+        return value.__dict__
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class BSONResponse(ORJSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=bson_default, option=orjson.OPT_NON_STR_KEYS)
+
+def cache_validators(modified_at: Optional[datetime]) -> dict:
+    if modified_at is None:
+        return {}
+    modified_at = modified_at.replace(tzinfo=timezone.utc)
+    return {
+        "ETag": f'W/"{int(modified_at.timestamp() * 1000):x}"',
+        "Last-Modified": format_datetime(modified_at, usegmt=True),
+    }
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def is_not_modified(request: Request, validators: dict) -> bool:
+    if not validators:
+        return False
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etag = _opaque_tag(validators["ETag"])
+        return any(tag.strip() == "*" or _opaque_tag(tag) == etag for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return parsedate_to_datetime(validators["Last-Modified"]) <= since
+    return False
+
+def not_modified_response(validators: dict) -> Response:
+    return Response(status_code=304, headers=validators)
@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from app.api.core.metrics import app_startup_seconds
+
+logger = logging.getLogger(__name__)
+
+class StartupTracker:
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.phases = {}
+        self.indexes = "pending"
+        self.index_error = None
+        self._task: asyncio.Task = None
+
+    def mark(self, phase: str):
+        if phase in self.phases:
+            return
+        seconds = time.perf_counter() - self.started_at
+        self.phases[phase] = seconds
+        app_startup_seconds.set(round(seconds, 6), phase)
+        logger.info("Startup phase %s completed after %.3fs", phase, seconds)
+
+    async def build_indexes(self, build: Callable[[], Awaitable], retry_seconds: float = 5.0):
+        self.indexes = "building"
+        while True:
+            try:
+                await build()
+            except Exception as e:
+                self.indexes = "failed"
+                self.index_error = str(e)
+                logger.error("Index build failed, retrying in %ss: %s", retry_seconds, e)
+                await asyncio.sleep(retry_seconds)
+                self.indexes = "building"
+                continue
+            self.indexes = "ready"
+            self.index_error = None
+            self.mark("indexes")
+            return
+
+    def build_indexes_in_background(self, build: Callable[[], Awaitable], retry_seconds: float = 5.0):
+        if self._task is None:
+            self._task = asyncio.create_task(self.build_indexes(build, retry_seconds), name="index-build")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    @property
+    def ready(self) -> bool:
+        return self.indexes == "ready" and "startup" in self.phases
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "indexes": self.indexes,
+            "index_error": self.index_error,
+            "phases": {phase: round(seconds, 3) for phase, seconds in self.phases.items()},
+        }
+
+class FirstRequestMiddleware:
+    def __init__(self, app, tracker: StartupTracker):
+        self.app = app
+        self.tracker = tracker
+        self.seen = False
+
+    async def __call__(self, scope, receive, send):
+        if self.seen or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.seen = True
+            self.tracker.mark("first_request")
@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from app.api.core.admission import AdmissionController, AdmissionMiddleware
+
+def test_group_for_classifies_routes():
+    controller = AdmissionController()
+
+    assert controller.group_for("GET", "/api/v1/orders/abc").name == "reads"
+    assert controller.group_for("POST", "/api/v1/orders/").name == "order_create"
+    assert controller.group_for("POST", "/api/v1/orders/bulk").name == "writes"
+    assert controller.group_for("PUT", "/api/v1/customers/abc").name == "writes"
+    assert controller.group_for("GET", "/api/v1/ready") is None
+    assert controller.group_for("POST", "/api/v1/customers/lookup").name == "reads"
+    assert controller.group_for("GET", "/api/v1/orders/export") is None
+    assert controller.group_for("GET", "/api/v1/orders/abc/events") is None
+
+@pytest.mark.asyncio
+async def test_admit_sheds_after_queue_wait():
+    controller = AdmissionController(order_create_limit=1, max_queue_wait_ms=10)
+    group = controller.groups["order_create"]
+
+    assert await controller.admit(group)
+    assert not await controller.admit(group)
+    assert controller.status()["shedding"]
+
+    group.release()
+    assert await controller.admit(group)
+
+@pytest.mark.asyncio
+async def test_only_sustained_shedding_fails_readiness():
+    controller = AdmissionController(max_loop_lag_ms=50, retry_after_seconds=1, unready_after_seconds=5)
+    controller.lag_monitor.lag_seconds = 0.2
+
+    assert not await controller.admit(controller.groups["reads"])
+    assert controller.status()["shedding"]
+    assert controller.status()["ready"]
+
+    controller.shed_since -= 5
+    assert not await controller.admit(controller.groups["reads"])
+    assert not controller.status()["ready"]
+
+@pytest.mark.asyncio
+async def test_admit_sheds_on_event_loop_lag_and_pool_waiters():
+    waiters = 0
+    controller = AdmissionController(max_loop_lag_ms=50, max_pool_waiters=10, unready_after_seconds=0, pool_waiters=lambda: waiters)
+    group = controller.groups["reads"]
+
+    controller.lag_monitor.lag_seconds = 0.2
+    assert not await controller.admit(group)
+    assert controller.status()["overload"] == "event_loop_lag"
+
+    controller.lag_monitor.lag_seconds = 0
+    waiters = 11
+    assert not await controller.admit(group)
+    assert controller.status()["overload"] == "mongo_pool"
+    assert not controller.status()["ready"]
+
+@pytest.mark.asyncio
+async def test_middleware_returns_503_with_retry_after():
+    controller = AdmissionController(read_limit=1, max_queue_wait_ms=10, retry_after_seconds=2)
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = AdmissionMiddleware(app, controller)
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/orders/abc"}
+    first_messages, second_messages = [], []
+
+    def collect(messages):
+        async def send(message):
+            messages.append(message)
+        return send
+
+    first = asyncio.create_task(middleware(scope, None, collect(first_messages)))
+    await asyncio.sleep(0)
+    await middleware(scope, None, collect(second_messages))
+    release.set()
+    await first
+
+    assert first_messages[0]["status"] == 200
+    assert second_messages[0]["status"] == 503
+    assert (b"retry-after", b"2") in second_messages[0]["headers"]
+    assert controller.groups["reads"].active == 0
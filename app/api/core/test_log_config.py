@@ -0,0 +1,47 @@
+import json
+import logging
+import queue
+import sys
+from app.api.core.log_config import DeferredQueueHandler, JSONFormatter, SuccessSampler, parse_log_levels
+
+def make_record(msg="Order %s created", args=("abc",), **extra):
+    record = logging.makeLogRecord({"name": "app.test", "levelname": "INFO", "levelno": logging.INFO, "msg": msg, "args": args})
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter_formats_message_and_extras():
+    entry = json.loads(JSONFormatter().format(make_record(order_id="abc")))
+
+    assert entry["message"] == "Order abc created"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.test"
+    assert entry["order_id"] == "abc"
+
+def test_sampler_only_drops_sampled_records():
+    sampler = SuccessSampler(rate=0)
+
+    assert sampler.filter(make_record())
+    assert not sampler.filter(make_record(sampled=True))
+    assert SuccessSampler(rate=1).filter(make_record(sampled=True))
+
+def test_parse_log_levels():
+    assert parse_log_levels("app.api.services.order_service=debug, pymongo=WARNING") == {
+        "app.api.services.order_service": "DEBUG",
+        "pymongo": "WARNING",
+    }
+
+def test_queue_handler_snapshots_message_before_enqueueing():
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    order = {"status": "pending"}
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record(msg="Order %s", args=(order,), exc_info=sys.exc_info(), order_id="abc")
+    handler.emit(record)
+    order["status"] = "completed"
+
+    entry = json.loads(JSONFormatter().format(log_queue.get_nowait()))
+    assert entry["message"] == "Order {'status': 'pending'}"
+    assert entry["order_id"] == "abc"
+    assert "ValueError: boom" in entry["exception"]
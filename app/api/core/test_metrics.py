@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+from app.api.core.metrics import Counter, Histogram, MongoCommandMetrics, mongo_command_duration_seconds, mongo_command_errors_total
+
+def test_counter_renders_labels():
+    counter = Counter("requests_total", "Requests.", ("route",))
+    counter.inc("/api/v1/orders/{order_id}")
+    counter.inc("/api/v1/orders/{order_id}")
+
+    assert 'requests_total{route="/api/v1/orders/{order_id}"} 2' in counter.render()
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+    histogram.observe(0.05, "/")
+    histogram.observe(0.5, "/")
+    histogram.observe(5, "/")
+
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{route="/",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/"} 3' in lines
+
+def test_mongo_command_listener_records_collection_and_command():
+    listener = MongoCommandMetrics()
+    started = SimpleNamespace(command_name="find", command={"find": "metrics_test"}, request_id=1, connection_id=("h", 1))
+    listener.started(started)
+    listener.failed(SimpleNamespace(command_name="find", request_id=1, connection_id=("h", 1), duration_micros=1500))
+
+    assert any('collection="metrics_test",command="find"' in line for line in mongo_command_duration_seconds.render())
+    assert any('collection="metrics_test",command="find"} 1' in line for line in mongo_command_errors_total.render())
@@ -0,0 +1,64 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from bson import Decimal128, ObjectId
+from fastapi import Request
+
+from app.api.core.responses import BSONResponse, cache_validators, is_not_modified
+from app.api.models.order_model import OrderInDB, OrderPage
+
+def test_bson_response_encodes_bson_types():
+    order_id = ObjectId()
+    body = BSONResponse({"_id": order_id, "total": Decimal128(Decimal("12.50")), "at": datetime(2024, 5, 1, 12, 30)}).body
+
+    assert json.loads(body) == {"_id": str(order_id), "total": "12.50", "at": "2024-05-01T12:30:00"}
+
+def test_bson_response_matches_pydantic_serialization():
+    order = OrderInDB.model_construct(
+        id=str(ObjectId()),
+        item="Pizza",
+        price=12.5,
+        customer_id=str(ObjectId()),
+        status="pending",
+        created_at=datetime(2024, 5, 1, 12, 30, 15, 123456),
+        updated_at=datetime(2024, 5, 1, 12, 30, 15, 123456),
+    )
+    page = OrderPage.model_construct(items=[order], next_cursor=None)
+
+    assert json.loads(BSONResponse(page).body) == json.loads(page.model_dump_json())
+
+def test_bson_response_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        BSONResponse({"value": object()})
+
+def _request(headers: dict) -> Request:
+    return Request({"type": "http", "headers": [(key.lower().encode(), value.encode()) for key, value in headers.items()]})
+
+def test_cache_validators_derive_from_modified_time():
+    validators = cache_validators(datetime(2024, 5, 1, 12, 30, 15, 123000))
+
+    assert validators["ETag"] == f'W/"{int(datetime(2024, 5, 1, 12, 30, 15, 123000, tzinfo=timezone.utc).timestamp() * 1000):x}"'
+    assert validators["Last-Modified"] == "Wed, 01 May 2024 12:30:15 GMT"
+    assert cache_validators(None) == {}
+
+def test_is_not_modified_matches_etag():
+    validators = cache_validators(datetime(2024, 5, 1, 12, 30))
+
+    assert is_not_modified(_request({"If-None-Match": validators["ETag"]}), validators)
+    assert is_not_modified(_request({"If-None-Match": f'"other", {validators["ETag"][2:]}'}), validators)
+    assert not is_not_modified(_request({"If-None-Match": '"other"'}), validators)
+
+def test_is_not_modified_prefers_etag_over_modified_since():
+    validators = cache_validators(datetime(2024, 5, 1, 12, 30))
+    request = _request({"If-None-Match": '"other"', "If-Modified-Since": "Thu, 02 May 2024 00:00:00 GMT"})
+
+    assert not is_not_modified(request, validators)
+
+def test_is_not_modified_compares_modified_since():
+    validators = cache_validators(datetime(2024, 5, 1, 12, 30, 15, 500000))
+
+    assert is_not_modified(_request({"If-Modified-Since": "Wed, 01 May 2024 12:30:15 GMT"}), validators)
+    assert not is_not_modified(_request({"If-Modified-Since": "Wed, 01 May 2024 12:30:14 GMT"}), validators)
+    assert not is_not_modified(_request({"If-Modified-Since": "not a date"}), validators)
@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app.api.core.metrics import app_startup_seconds
+from app.api.core.startup import FirstRequestMiddleware, StartupTracker
+
+def test_phases_are_recorded_once():
+    tracker = StartupTracker(started_at=0.0)
+    tracker.mark("startup_test")
+    first = tracker.phases["startup_test"]
+    tracker.mark("startup_test")
+
+    assert tracker.phases["startup_test"] == first
+    assert any('phase="startup_test"' in line for line in app_startup_seconds.render())
+
+@pytest.mark.asyncio
+async def test_background_index_build_gates_readiness():
+    tracker = StartupTracker(started_at=0.0)
+    release = asyncio.Event()
+
+    async def build():
+        await release.wait()
+
+    tracker.mark("startup")
+    tracker.build_indexes_in_background(build)
+    await asyncio.sleep(0)
+    assert tracker.status()["indexes"] == "building"
+    assert not tracker.ready
+
+    release.set()
+    await tracker._task
+
+    assert tracker.ready
+    assert "indexes" in tracker.phases
+
+@pytest.mark.asyncio
+async def test_failed_index_build_is_retried():
+    tracker = StartupTracker(started_at=0.0)
+    build = AsyncMock(side_effect=[Exception("not primary"), None])
+
+    await tracker.build_indexes(build, retry_seconds=0)
+
+    assert build.await_count == 2
+    assert tracker.indexes == "ready" and tracker.index_error is None
+
+@pytest.mark.asyncio
+async def test_stop_cancels_pending_build():
+    tracker = StartupTracker(started_at=0.0)
+    tracker.build_indexes_in_background(lambda: asyncio.sleep(10))
+    await asyncio.sleep(0)
+
+    await tracker.stop()
+
+    assert tracker.indexes == "building"
+
+def test_first_request_is_timed():
+    tracker = StartupTracker(started_at=0.0)
+    app = Starlette(routes=[Route("/", lambda request: PlainTextResponse("ok"))])
+    client = TestClient(FirstRequestMiddleware(app, tracker))
+
+    client.get("/")
+    first = tracker.phases["first_request"]
+    client.get("/")
+
+    assert tracker.phases["first_request"] == first
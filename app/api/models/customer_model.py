@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from pydantic import AliasChoices, BaseModel, Field, EmailStr
+from typing import List, Optional
 from datetime import datetime
 
 class CustomerCreate(BaseModel):
@@ -9,9 +9,25 @@ class CustomerCreate(BaseModel):
 
 class CustomerUpdate(BaseModel):
     full_name: Optional[str] = Field(None, min_length=1)
-    email_address: Optional[EmailStr]
+    email_address: Optional[EmailStr] = None
     phone_number: Optional[str] = Field(None, pattern=r"^\+\d{1,3}\d{9,15}$")
 
 class CustomerInDB(CustomerCreate):
     _id: str
-    created_at: datetime
\ No newline at end of file
+    id: Optional[str] = Field(None, validation_alias=AliasChoices("id", "_id"))
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+class CustomerPage(BaseModel):
+    items: List[CustomerInDB]
+    next_cursor: Optional[str] = None
+
+class CustomerBatch(BaseModel):
+    items: List[CustomerInDB]
+    missing: List[str] = []
+
+class CustomerSearch(BaseModel):
+    items: List[CustomerInDB]
+
+class CustomerLookup(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=1000)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import AliasChoices, BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 
 class OrderCreate(BaseModel):
@@ -12,7 +12,19 @@ class OrderUpdate(BaseModel):
     price: Optional[float] = Field(None, gt=0)
     status: Optional[str] = Field(None, pattern=r"^(pending|completed|cancelled)$") 
 
+class CustomerSnapshot(BaseModel):
+    full_name: str
+    phone_number: str
+    synced_at: Optional[datetime] = None
+
 class OrderInDB(OrderCreate):
     _id: str
+    id: Optional[str] = Field(None, validation_alias=AliasChoices("id", "_id"))
+    status: str = "pending"
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    customer: Optional[CustomerSnapshot] = None
+
+class OrderPage(BaseModel):
+    items: List[OrderInDB]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+class CustomerOrderSummary(BaseModel):
+    customer_id: str
+    order_count: int = 0
+    total_spend: float = 0
+    pending: int = 0
+    completed: int = 0
+    cancelled: int = 0
+
+class DailySales(BaseModel):
+    date: str
+    order_count: int = 0
+    revenue: float = 0
+    pending: int = 0
+    completed: int = 0
+    cancelled: int = 0
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.api.core.log_config import SAMPLED
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_STATUSES = ("completed", "cancelled")
+
+class OrderArchiver:
+    def __init__(
+        self,
+        db,
+        age_seconds: float,
+        batch_size: int = 500,
+        max_orders_per_second: float = 1000.0,
+        interval_seconds: float = 3600.0,
+    ):
+        self.db = db
+        self.age_seconds = age_seconds
+        self.batch_size = batch_size
+        self.max_orders_per_second = max_orders_per_second
+        self.interval_seconds = interval_seconds
+        self._task: asyncio.Task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="order-archiver")
+            logger.info("Order archiver started for orders older than %ss", self.age_seconds)
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.archive()
+            except Exception as e:
+                logger.error("Order archiving failed: %s", e)
+            await asyncio.sleep(self.interval_seconds)
+
+    def _filter(self, cutoff: datetime) -> dict:
+        return {
+            "status": {"$in": list(ARCHIVED_STATUSES)},
+            "updated_at": {"$not": {"$gte": cutoff}},
+        }
+
+    async def archive(self) -> int:
+        cutoff = datetime.utcnow() - timedelta(seconds=self.age_seconds)
+        last_id = None
+        archived = 0
+        while True:
+            start = time.monotonic()
+            id_range = {"$lt": ObjectId.from_datetime(cutoff)}
+            if last_id is not None:
+                id_range["$gt"] = last_id
+
+            orders = await self.db.orders.find({"_id": id_range, **self._filter(cutoff)}).sort("_id", 1).limit(self.batch_size).to_list(length=self.batch_size)
+            if not orders:
+                break
+            last_id = orders[-1]["_id"]
+            archived += await self._move(orders, cutoff)
+
+            if len(orders) < self.batch_size:
+                break
+            if self.max_orders_per_second > 0:
+                await asyncio.sleep(max(0.0, len(orders) / self.max_orders_per_second - (time.monotonic() - start)))
+
+        if archived:
+            logger.info("Archived %s orders", archived)
+        return archived
+
+    async def _move(self, orders: list, cutoff: datetime) -> int:
+        ids = [order["_id"] for order in orders]
+        try:
+            await self.db.orders_archive.insert_many(orders, ordered=False)
+        except BulkWriteError as e:
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+
+        # delete_many only reports a count, so delete one by one to learn which copies we own.
+        results = await asyncio.gather(*(self.db.orders.delete_one({"_id": order_id, **self._filter(cutoff)}) for order_id in ids))
+        deleted = sum(result.deleted_count for result in results)
+        # Orders updated or deleted since they were copied are not ours to archive; drop their copies.
+        stale = [order_id for order_id, result in zip(ids, results) if not result.deleted_count]
+        if stale:
+            await self.db.orders_archive.delete_many({"_id": {"$in": stale}})
+
+        logger.info("Moved %s orders up to %s into the archive", deleted, ids[-1], extra=SAMPLED)
+        return deleted
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+class BatchLoader:
+    def __init__(self, load_many: Callable[[list], Awaitable[dict]], max_batch: int = 1000):
+        self.load_many = load_many
+        self.max_batch = max_batch
+        self._pending = {}
+        self._inflight = {}
+        self._scheduled = False
+        self._tasks = set()
+
+    async def load(self, key: Hashable):
+        future = self._inflight.get(key) or self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            if len(self._pending) >= self.max_batch:
+                self._dispatch()
+            elif not self._scheduled:
+                self._scheduled = True
+                asyncio.get_running_loop().call_soon(self._dispatch)
+        return await asyncio.shield(future)
+
+    def forget(self, key: Hashable):
+        # Later loads start a new query instead of joining one that may return stale data.
+        self._inflight.pop(key, None)
+
+    def _dispatch(self):
+        self._scheduled = False
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        self._inflight.update(batch)
+        task = asyncio.create_task(self._load(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _load(self, batch: dict):
+        try:
+            results = await self.load_many(list(batch))
+        except Exception as e:
+            logger.error("Batch load of %s keys failed: %s", len(batch), e)
+            for key, future in batch.items():
+                self._discard(key, future)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in batch.items():
+            self._discard(key, future)
+            if not future.done():
+                future.set_result(results.get(key))
+
+    def _discard(self, key: Hashable, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
@@ -0,0 +1,120 @@
+import json
+import logging
+from typing import AsyncIterator, Awaitable, Callable
+
+from fastapi import HTTPException, Request
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+async def read_bulk_rows(request: Request) -> AsyncIterator:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    if content_type in NDJSON_CONTENT_TYPES:
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield _parse_line(line)
+        if buffer.strip():
+            yield _parse_line(buffer)
+        return
+
+    try:
+        rows = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON.")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON.")
+    for row in rows:
+        yield row
+
+def _parse_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Invalid JSON: {str(e)}")
+
+def validation_error(e: Exception) -> str:
+    if isinstance(e, ValidationError):
+        return "; ".join(f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in e.errors())
+    return str(e)
+
+class BulkInsertResult:
+    def __init__(self):
+        self.inserted = 0
+        self.failed = 0
+        self.results = []
+
+    def ok(self, index: int, document_id):
+        self.inserted += 1
+        self.results.append({"index": index, "status": "inserted", "id": str(document_id)})
+
+    def error(self, index: int, error: str):
+        self.failed += 1
+        self.results.append({"index": index, "status": "error", "error": error})
+
+    def to_dict(self):
+        self.results.sort(key=lambda result: result["index"])
+        return {"inserted": self.inserted, "failed": self.failed, "results": self.results}
+
+async def bulk_insert(
+    collection,
+    rows: AsyncIterator,
+    prepare_chunk: Callable[[list, BulkInsertResult], Awaitable[list]],
+    chunk_size: int,
+    on_inserted: Callable[[list], Awaitable[None]] = None,
+) -> dict:
+    result = BulkInsertResult()
+    chunk = []
+    index = 0
+
+    async for row in rows:
+        chunk.append((index, row))
+        index += 1
+        if len(chunk) >= chunk_size:
+            await _insert_chunk(collection, chunk, prepare_chunk, result, on_inserted)
+            chunk = []
+
+    if chunk:
+        await _insert_chunk(collection, chunk, prepare_chunk, result, on_inserted)
+
+    logger.info("Bulk insert into %s finished: %s inserted, %s failed", collection.name, result.inserted, result.failed)
+    return result.to_dict()
+
+async def _insert_chunk(collection, chunk, prepare_chunk, result: BulkInsertResult, on_inserted):
+    prepared = await prepare_chunk(chunk, result)
+    if not prepared:
+        return
+
+    documents = [document for _, document in prepared]
+    failed = {}
+    try:
+        await collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        for write_error in e.details.get("writeErrors", []):
+            failed[write_error["index"]] = write_error
+    except Exception as e:
+        logger.error("Bulk insert chunk into %s failed: %s", collection.name, e)
+        for index, _ in prepared:
+            result.error(index, str(e))
+        return
+
+    inserted = []
+    for position, (index, document) in enumerate(prepared):
+        write_error = failed.get(position)
+        if write_error is None:
+            result.ok(index, document["_id"])
+            inserted.append(document)
+        elif write_error.get("code") == 11000 and write_error.get("keyValue"):
+            result.error(index, "Duplicate key: " + ", ".join(f"{key}={value}" for key, value in (write_error.get("keyValue") or {}).items()))
+        else:
+            result.error(index, write_error.get("errmsg", "Write failed."))
+
+    if inserted and on_inserted is not None:
+        await on_inserted(inserted)
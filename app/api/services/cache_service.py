@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    def __init__(self, maxsize: int = 10000, ttl_seconds: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        # Bumped on every invalidation so loads that started earlier cannot cache stale values.
+        self.generation = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value, generation: int = None):
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        self.generation += 1
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        self.generation += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+class ChangeStreamInvalidator:
+    def __init__(self, collection, cache: TTLCache, retry_seconds: float = 5.0):
+        self.collection = collection
+        self.cache = cache
+        self.retry_seconds = retry_seconds
+        self._resume_token = None
+        self._task: asyncio.Task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch(), name=f"{self.collection.name}-cache-invalidator")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _watch(self):
+        pipeline = [{"$match": {"operationType": {"$in": ["update", "replace", "delete"]}}}]
+        while True:
+            try:
+                async with self.collection.watch(pipeline, resume_after=self._resume_token) as stream:
+                    logger.info("Watching %s for cache invalidation", self.collection.name)
+                    async for change in stream:
+                        self.cache.invalidate(str(change["documentKey"]["_id"]))
+                        self._resume_token = stream.resume_token
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Change stream on %s failed, retrying in %ss: %s", self.collection.name, self.retry_seconds, e)
+                self._resume_token = None
+                self.cache.clear()
+                await asyncio.sleep(self.retry_seconds)
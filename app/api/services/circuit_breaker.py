@@ -0,0 +1,46 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def before_call(self):
+        state = self.state
+        if state == "open" or (state == "half_open" and self._probing):
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        if state == "half_open":
+            self._probing = True
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("%s circuit closed", self.name)
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.error("%s circuit opened after %s failures", self.name, self.failures)
+            self.opened_at = time.monotonic()
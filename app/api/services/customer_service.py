@@ -1,123 +1,311 @@
 import logging
-from app.api.models.customer_model import CustomerInDB, CustomerUpdate
+import asyncio
+import re
+from app.api.models.customer_model import CustomerBatch, CustomerCreate, CustomerInDB, CustomerPage, CustomerSearch, CustomerUpdate
+from app.api.services.bulk_service import bulk_insert, validation_error
+from app.api.services.pagination import encode_cursor, keyset_filter, keyset_sort
+from app.api.services.cache_service import TTLCache
+from app.api.services.batch_loader import BatchLoader
+from app.api.core.log_config import SAMPLED
 from bson import ObjectId
 from datetime import datetime
 from fastapi import HTTPException
-from pymongo import errors
+from pymongo import ReturnDocument, UpdateOne, errors
 
 logger = logging.getLogger(__name__)
 
+CUSTOMER_PROJECTION = {"full_name": 1, "email_address": 1, "phone_number": 1, "created_at": 1, "updated_at": 1}
+MAX_LOOKUP_IDS = 1000
+
+def normalize_name(name: str) -> str:
+    return " ".join(name.casefold().split())
+
+def normalize_phone(phone: str) -> str:
+    digits = re.sub(r"\D", "", phone)
+    return "+" + digits if digits else ""
+
+def normalize_email(email: str) -> str:
+    local, at, domain = email.strip().rpartition("@")
+    return f"{local}@{domain.lower()}" if at else email.strip()
+
 class CustomerService:
-    def __init__(self, db):
+    def __init__(self, db, cache: TTLCache = None):
         self.db = db
+        self.cache = cache
+        self.loader = BatchLoader(self._find_customers)
+        self._snapshot_refreshes = set()
+        self._backfill: asyncio.Task = None
 
     async def create_customer(self, customer_data):
         customer_data['created_at'] = datetime.utcnow()
+        customer_data['name_lower'] = normalize_name(customer_data['full_name'])
         try:
-            logger.info(f"Creating new customer with data: {customer_data}")
+            logger.debug("Creating new customer with data: %s", customer_data)
             result = await self.db.customers.insert_one(customer_data)
             customer_id = result.inserted_id
             customer_data.pop('_id', None)
-            logger.info(f"Customer created successfully with ID: {customer_id}")
-            return CustomerInDB(**customer_data, _id=str(customer_id))
+            customer_data.pop('name_lower', None)
+            logger.info("Customer created successfully with ID: %s", customer_id, extra=SAMPLED)
+            return CustomerInDB.model_construct(**customer_data, id=str(customer_id))
         except errors.DuplicateKeyError:
-            logger.error(f"Duplicate key error for email: {customer_data.get('email_address')}")
+            logger.error("Duplicate key error for email: %s", customer_data.get('email_address'))
             raise HTTPException(status_code=400, detail="Email address already exists.")
         except Exception as e:
-            logger.error(f"Error occurred while creating customer: {str(e)}")
+            logger.error("Error occurred while creating customer: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
 
+    async def bulk_create_customers(self, rows, chunk_size: int = 1000):
+        async def prepare_chunk(chunk, result):
+            prepared = []
+            for index, row in chunk:
+                try:
+                    if isinstance(row, Exception):
+                        raise row
+                    customer_data = CustomerCreate(**row).dict()
+                except Exception as e:
+                    result.error(index, validation_error(e))
+                    continue
+                customer_data['created_at'] = datetime.utcnow()
+                customer_data['name_lower'] = normalize_name(customer_data['full_name'])
+                prepared.append((index, customer_data))
+            return prepared
+
+        return await bulk_insert(self.db.customers, rows, prepare_chunk, chunk_size)
+
+    def _to_customer(self, customer: dict) -> CustomerInDB:
+        return CustomerInDB.model_construct(**{**customer, "id": str(customer["_id"])})
+
+    async def list_customers(self, cursor: str = None, limit: int = 50):
+        query = keyset_filter(cursor) if cursor else {}
+        documents = await self.db.customers.find(query, CUSTOMER_PROJECTION).sort(keyset_sort()).limit(limit + 1).to_list(length=limit + 1)
+
+        next_cursor = encode_cursor(documents[limit - 1]) if len(documents) > limit else None
+        items = [self._to_customer(customer) for customer in documents[:limit]]
+        return CustomerPage.model_construct(items=items, next_cursor=next_cursor)
+
+    async def search_customers(self, name: str = None, phone: str = None, email: str = None, text: str = None, limit: int = 20):
+        query = {}
+        sort = [("_id", 1)]
+        projection = CUSTOMER_PROJECTION
+        if email is not None:
+            query["email_address"] = normalize_email(email)
+        if phone is not None:
+            phone_prefix = normalize_phone(phone)
+            if not phone_prefix:
+                raise HTTPException(status_code=400, detail="Provide at least one digit of the phone number.")
+            query["phone_number"] = {"$regex": "^" + re.escape(phone_prefix)}
+            sort = [("phone_number", 1), ("_id", 1)]
+        if name is not None:
+            name_prefix = normalize_name(name)
+            if not name_prefix:
+                raise HTTPException(status_code=400, detail="Provide at least one character of the name.")
+            query["name_lower"] = {"$regex": "^" + re.escape(name_prefix)}
+            sort = [("name_lower", 1), ("_id", 1)]
+        if text is not None:
+            if not text.strip():
+                raise HTTPException(status_code=400, detail="Provide at least one word to search for.")
+            query["$text"] = {"$search": text}
+            projection = {**CUSTOMER_PROJECTION, "score": {"$meta": "textScore"}}
+            sort = [("score", {"$meta": "textScore"}), ("_id", 1)]
+        if not query:
+            raise HTTPException(status_code=400, detail="Provide a name, phone, email or q to search for.")
+
+        logger.debug("Searching customers with query: %s", query)
+        documents = await self.db.customers.find(query, projection).sort(sort).limit(limit).to_list(length=limit)
+        return CustomerSearch.model_construct(items=[self._to_customer(customer) for customer in documents])
+
+    def start_search_backfill(self, batch_size: int = 1000):
+        if self._backfill is None:
+            self._backfill = asyncio.create_task(self.backfill_search_fields(batch_size), name="customer-search-backfill")
+
+    async def backfill_search_fields(self, batch_size: int = 1000):
+        updated = 0
+        try:
+            batch = []
+            async for customer in self.db.customers.find({"name_lower": None}, {"full_name": 1}).batch_size(batch_size):
+                batch.append(UpdateOne(
+                    {"_id": customer["_id"], "name_lower": None},
+                    {"$set": {"name_lower": normalize_name(customer.get("full_name") or "")}},
+                ))
+                if len(batch) >= batch_size:
+                    updated += (await self.db.customers.bulk_write(batch, ordered=False)).modified_count
+                    batch = []
+            if batch:
+                updated += (await self.db.customers.bulk_write(batch, ordered=False)).modified_count
+        except Exception as e:
+            logger.error("Customer search backfill stopped after %s customers: %s", updated, e)
+            return updated
+
+        if updated:
+            logger.info("Backfilled search fields on %s customers", updated)
+        return updated
+
+    async def _find_customers(self, obj_ids: list) -> dict:
+        if len(obj_ids) == 1:
+            customer = await self.db.customers.find_one({"_id": obj_ids[0]}, CUSTOMER_PROJECTION)
+            customers = [customer] if customer is not None else []
+        else:
+            logger.debug("Fetching %s customers in one query", len(obj_ids))
+            customers = await self.db.customers.find({"_id": {"$in": obj_ids}}, CUSTOMER_PROJECTION).to_list(length=len(obj_ids))
+        return {customer["_id"]: self._to_customer(customer) for customer in customers}
+
+    async def _load_customer(self, obj_id: ObjectId):
+        if self.cache is not None:
+            cached = self.cache.get(str(obj_id))
+            if cached is not None:
+                return cached
+
+        generation = self.cache.generation if self.cache is not None else None
+        customer = await self.loader.load(obj_id)
+        if customer is not None and self.cache is not None:
+            self.cache.set(str(obj_id), customer, generation)
+        return customer
+
+    async def get_customers(self, customer_ids: list):
+        if not customer_ids or len(customer_ids) > MAX_LOOKUP_IDS:
+            raise HTTPException(status_code=400, detail=f"Provide between 1 and {MAX_LOOKUP_IDS} customer IDs.")
+
+        obj_ids = []
+        for customer_id in dict.fromkeys(customer_ids):
+            if not ObjectId.is_valid(customer_id):
+                logger.error("Invalid ObjectId provided: %s", customer_id)
+                raise HTTPException(status_code=400, detail=f"Provide valid ObjectIds. {customer_id} is NOT valid.")
+            obj_ids.append(ObjectId(customer_id))
+
+        customers = await asyncio.gather(*(self._load_customer(obj_id) for obj_id in obj_ids))
+        return CustomerBatch.model_construct(
+            items=[customer for customer in customers if customer is not None],
+            missing=[str(obj_id) for obj_id, customer in zip(obj_ids, customers) if customer is None],
+        )
+
     async def get_customer(self, customer_id: str):
         try:
             obj_id = ObjectId(customer_id)
-            logger.info(f"Fetching customer with ID: {customer_id}")
+            logger.debug("Fetching customer with ID: %s", customer_id)
         except Exception:
-            logger.error(f"Invalid ObjectId provided: {customer_id}")
+            logger.error("Invalid ObjectId provided: %s", customer_id)
             raise HTTPException(status_code=400, detail="Provide a valid ObjectId. The one you've provided is NOT valid.")
 
-        customer = await self.db.customers.find_one({"_id": obj_id})
+        customer = await self._load_customer(obj_id)
 
         if customer is None:
-            logger.warning(f"Customer with ID {customer_id} not found.")
+            logger.warning("Customer with ID %s not found.", customer_id)
             raise HTTPException(status_code=404, detail="Customer NOT found.")
 
-        customer["_id"] = str(customer["_id"])
-        logger.info(f"Customer fetched successfully: {customer}")
-        return CustomerInDB(**customer)
-
+        logger.debug("Customer fetched successfully: %s", customer)
+        return customer
 
-    async def update_customer(self, customer_id: str, update_data: CustomerUpdate):
+    async def get_customer_modified(self, customer_id: str):
         try:
             obj_id = ObjectId(customer_id)
-            logger.info(f"Updating customer with ID: {customer_id}")
         except Exception:
-            logger.error(f"Invalid ObjectId provided for update: {customer_id}")
-            raise HTTPException(status_code=400, detail="Invalid ObjectId provided for update.")
+            logger.error("Invalid ObjectId provided: %s", customer_id)
+            raise HTTPException(status_code=400, detail="Provide a valid ObjectId. The one you've provided is NOT valid.")
 
+        customer = self.cache.get(str(obj_id)) if self.cache is not None else None
+        if customer is not None:
+            return customer.updated_at or customer.created_at
 
-        update_data_dict = update_data.dict(exclude_unset=True)
+        customer = await self.db.customers.find_one({"_id": obj_id}, {"updated_at": 1, "created_at": 1})
+        if customer is None:
+            logger.warning("Customer with ID %s not found.", customer_id)
+            raise HTTPException(status_code=404, detail="Customer NOT found.")
+        return customer.get("updated_at") or customer.get("created_at")
 
-        if update_data_dict:
-            update_data_dict['updated_at'] = datetime.utcnow()
+    def _invalidate(self, obj_id: ObjectId):
+        self.loader.forget(obj_id)
+        if self.cache is not None:
+            self.cache.invalidate(str(obj_id))
 
-        try:
-            existing_customer = await self.db.customers.find_one({"_id": obj_id})
-            if not existing_customer:
-                logger.warning(f"Customer with ID: {customer_id} NOT found.")
-                raise HTTPException(status_code=404, detail=f"Customer with ID: {customer_id} NOT found.")
 
-            logger.info(f"Current customer data: {existing_customer}")
+    def _refresh_order_snapshots(self, customer: dict):
+        task = asyncio.create_task(self._update_order_snapshots(customer))
+        self._snapshot_refreshes.add(task)
+        task.add_done_callback(self._snapshot_refreshes.discard)
 
-            new_email = update_data_dict.get("email_address")
-            current_email = existing_customer.get("email_address")
+    async def _update_order_snapshots(self, customer: dict):
+        synced_at = customer["updated_at"]
+        snapshot = {"full_name": customer["full_name"], "phone_number": customer["phone_number"], "synced_at": synced_at}
+        try:
+            result = await self.db.orders.update_many(
+                {"customer_id": customer["_id"], "customer.synced_at": {"$not": {"$gt": synced_at}}},
+                {"$set": {"customer": snapshot}},
+            )
+            logger.info("Refreshed customer snapshot on %s orders for customer %s", result.modified_count, customer["_id"])
+        except Exception as e:
+            logger.error("Failed to refresh customer snapshot on orders for customer %s: %s", customer["_id"], e)
 
-            logger.info(f"New email: {new_email}, Current email: {current_email}")
+    async def close(self):
+        if self._backfill is not None:
+            self._backfill.cancel()
+            await asyncio.gather(self._backfill, return_exceptions=True)
+            self._backfill = None
+        if self._snapshot_refreshes:
+            await asyncio.gather(*self._snapshot_refreshes, return_exceptions=True)
 
-            if new_email and new_email != current_email:
+    async def update_customer(self, customer_id: str, update_data: CustomerUpdate):
+        try:
+            obj_id = ObjectId(customer_id)
+            logger.debug("Updating customer with ID: %s", customer_id)
+        except Exception:
+            logger.error("Invalid ObjectId provided for update: %s", customer_id)
+            raise HTTPException(status_code=400, detail="Invalid ObjectId provided for update.")
 
-                email_exists = await self.db.customers.find_one({"email_address": new_email})
-                logger.info(f"Email exists in database: {email_exists is not None}")
 
-                if email_exists:
-                    logger.error(f"Duplicate email address detected: {new_email}")
-                    raise HTTPException(status_code=400, detail="Email address already exists.")
+        update_data_dict = update_data.dict(exclude_unset=True)
 
+        try:
             if update_data_dict:
-                result = await self.db.customers.update_one({"_id": obj_id}, {"$set": update_data_dict})
-
-                if result.modified_count == 0:
-                    logger.warning(f"No modifications made or customer not found with ID: {customer_id}")
-                    raise HTTPException(status_code=404, detail="Customer NOT found or no changes made.")
-
-                logger.info(f"Customer updated successfully. Fetching updated customer.")
-                updated_customer = await self.get_customer(customer_id)
-                return updated_customer
+                update_data_dict['updated_at'] = datetime.utcnow()
+                if update_data_dict.get('full_name') is not None:
+                    update_data_dict['name_lower'] = normalize_name(update_data_dict['full_name'])
+                customer = await self.db.customers.find_one_and_update(
+                    {"_id": obj_id},
+                    {"$set": update_data_dict},
+                    projection=CUSTOMER_PROJECTION,
+                    return_document=ReturnDocument.AFTER,
+                )
+                self._invalidate(obj_id)
             else:
-                logger.info(f"No changes to update for customer ID: {customer_id}")
-                return await self.get_customer(customer_id)
-
+                logger.debug("No changes to update for customer ID: %s", customer_id)
+                customer = await self.db.customers.find_one({"_id": obj_id}, CUSTOMER_PROJECTION)
+        except errors.DuplicateKeyError:
+            logger.error("Duplicate email address detected: %s", update_data_dict.get('email_address'))
+            raise HTTPException(status_code=400, detail="Email address already exists.")
         except Exception as e:
-            logger.error(f"Error occurred during customer update: {str(e)}")
+            logger.error("Error occurred during customer update: %s", e)
             raise HTTPException(status_code=500, detail=f"Error updating customer: {str(e)}")
 
+        if customer is None:
+            logger.warning("Customer with ID: %s NOT found.", customer_id)
+            raise HTTPException(status_code=404, detail=f"Customer with ID: {customer_id} NOT found.")
+
+        if "full_name" in update_data_dict or "phone_number" in update_data_dict:
+            self._refresh_order_snapshots(customer)
+
+        logger.debug("Customer updated: %s", customer)
+        logger.info("Customer updated successfully with ID: %s", customer_id, extra=SAMPLED)
+        return self._to_customer(customer)
+
     async def delete_customer(self, customer_id: str):
         try:
             obj_id = ObjectId(customer_id) 
-            logger.info(f"Deleting customer with ID: {customer_id}")
+            logger.debug("Deleting customer with ID: %s", customer_id)
         except Exception:
-            logger.error(f"Provide a valid customer_id which is of type ObjectId. The one you provided ({customer_id}) is NOT valid.")
+            logger.error("Provide a valid customer_id which is of type ObjectId. The one you provided (%s) is NOT valid.", customer_id)
             raise HTTPException(status_code=400, detail=f"Provide a valid customer_id which is of type ObjectId. The one you've provided ({customer_id}) is NOT valid.")
 
         try:
             result = await self.db.customers.delete_one({"_id": obj_id})
+            self._invalidate(obj_id)
 
             if result.deleted_count == 0:
-                logger.warning(f"Customer not found with ID: {customer_id}")
+                logger.warning("Customer not found with ID: %s", customer_id)
                 raise HTTPException(status_code=404, detail="Customer NOT found.")
 
-            logger.info(f"Customer deleted successfully with ID: {customer_id}")
+            logger.info("Customer deleted successfully with ID: %s", customer_id, extra=SAMPLED)
             return {"detail": "Customer deleted successfully."}
 
         except Exception as e:
-            logger.error(f"Error occurred while deleting customer: {str(e)}")
+            logger.error("Error occurred while deleting customer: %s", e)
             raise HTTPException(status_code=500, detail="An unexpected error occurred: " + str(e))
\ No newline at end of file
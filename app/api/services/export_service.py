@@ -0,0 +1,34 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from app.api.models.order_model import OrderInDB
+
+EXPORT_FIELDS = [field for field in OrderInDB.model_fields if field != "customer"]
+
+def _value(order: dict, field: str):
+    if field == "id":
+        return str(order["_id"])
+    value = order.get(field)
+    if field == "customer_id" and value is not None:
+        return str(value)
+    if field == "status" and value is None:
+        return "pending"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def export_ndjson_row(order: dict) -> str:
+    return json.dumps({field: _value(order, field) for field in EXPORT_FIELDS}, separators=(",", ":")) + "\n"
+
+def export_csv_header() -> str:
+    return _csv_line(EXPORT_FIELDS)
+
+def export_csv_row(order: dict) -> str:
+    return _csv_line([_value(order, field) for field in EXPORT_FIELDS])
+
+def _csv_line(values: list) -> str:
+    output = io.StringIO()
+    csv.writer(output).writerow(values)
+    return output.getvalue()
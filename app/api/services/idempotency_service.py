@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+import orjson
+from fastapi import HTTPException, Response
+from pymongo import ReturnDocument, errors
+
+from app.api.core.responses import BSONResponse
+
+logger = logging.getLogger(__name__)
+
+def request_fingerprint(payload: dict) -> str:
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+class IdempotencyService:
+    def __init__(self, db, lease_seconds: float = 30.0, wait_seconds: float = 10.0, poll_interval_seconds: float = 0.05):
+        self.collection = db.idempotency_keys
+        self.lease_seconds = lease_seconds
+        self.wait_seconds = wait_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self._inflight = {}
+
+    async def execute(self, key: str, payload: dict, handler: Callable[[], Awaitable]) -> Response:
+        fingerprint = request_fingerprint(payload)
+        stored = await self._acquire(key, fingerprint)
+        if stored is not None:
+            logger.info("Replaying stored response for Idempotency-Key %s", key)
+            return Response(
+                content=stored["body"],
+                status_code=stored["status_code"],
+                media_type="application/json",
+                headers={"Idempotent-Replayed": "true"},
+            )
+
+        done = self._inflight[key] = asyncio.Event()
+        try:
+            try:
+                result = await handler()
+            except BaseException:
+                await asyncio.shield(self.collection.delete_one({"key": key, "status": "in_progress"}))
+                raise
+
+            # The side effect already happened, so keep the key even if the response cannot be stored.
+            response = BSONResponse(result)
+            try:
+                await asyncio.shield(self.collection.update_one(
+                    {"key": key},
+                    {"$set": {"status": "completed", "status_code": response.status_code, "body": response.body, "completed_at": datetime.utcnow()}},
+                ))
+            except Exception as e:
+                logger.error("Failed to store response for Idempotency-Key %s: %s", key, e)
+            return response
+        finally:
+            self._inflight.pop(key, None)
+            done.set()
+
+    async def _acquire(self, key: str, fingerprint: str):
+        deadline = asyncio.get_running_loop().time() + self.wait_seconds
+        delay = self.poll_interval_seconds
+        while True:
+            now = datetime.utcnow()
+            try:
+                await self.collection.insert_one({
+                    "key": key,
+                    "fingerprint": fingerprint,
+                    "status": "in_progress",
+                    "locked_until": now + timedelta(seconds=self.lease_seconds),
+                    "created_at": now,
+                })
+                return None
+            except errors.DuplicateKeyError:
+                pass
+
+            existing = await self.collection.find_one({"key": key})
+            if existing is None:
+                continue
+            if existing["fingerprint"] != fingerprint:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request.")
+            if existing["status"] == "completed":
+                return existing
+
+            if existing["locked_until"] <= now:
+                taken = await self.collection.find_one_and_update(
+                    {"key": key, "status": "in_progress", "locked_until": existing["locked_until"]},
+                    {"$set": {"locked_until": now + timedelta(seconds=self.lease_seconds)}},
+                    return_document=ReturnDocument.AFTER,
+                )
+                if taken is not None:
+                    logger.warning("Taking over expired Idempotency-Key %s", key)
+                    return None
+
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress.")
+
+            local = self._inflight.get(key)
+            if local is not None:
+                try:
+                    await asyncio.wait_for(local.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * 2, 1.0)
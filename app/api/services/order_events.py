@@ -0,0 +1,172 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+import orjson
+from fastapi import WebSocket
+from pymongo import errors
+
+from app.api.core.responses import bson_default
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "cancelled")
+CHANGE_STREAM_HISTORY_LOST = 286
+
+class Subscription:
+    def __init__(self, hub, key: tuple, queue_size: int):
+        self.hub = hub
+        self.key = key
+        self.queue = asyncio.Queue(queue_size)
+        self.overflowed = False
+
+    def push(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout: float):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def drain(self):
+        self.overflowed = False
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+class OrderEventHub:
+    def __init__(self, collection, queue_size: int = 100, retry_seconds: float = 5.0):
+        self.collection = collection
+        self.queue_size = queue_size
+        self.retry_seconds = retry_seconds
+        self.resume_token = None
+        self._subscriptions = {}
+        self._task: asyncio.Task = None
+
+    def subscribe(self, order_id: str = None, customer_id: str = None) -> Subscription:
+        key = ("order", order_id) if order_id is not None else ("customer", customer_id)
+        subscription = Subscription(self, key, self.queue_size)
+        self._subscriptions.setdefault(key, set()).add(subscription)
+        self.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscriptions.get(subscription.key)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscriptions[subscription.key]
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscriptions.values())
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch(), name="order-event-hub")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def publish(self, event: dict):
+        for key in (("order", event["order_id"]), ("customer", event["customer_id"])):
+            for subscription in list(self._subscriptions.get(key, ())):
+                subscription.push(event)
+
+    def _event(self, change: dict) -> dict:
+        document = change.get("fullDocument") or {}
+        return {
+            "id": change["_id"]["_data"],
+            "operation": change["operationType"],
+            "order_id": str(change["documentKey"]["_id"]),
+            "customer_id": str(document["customer_id"]) if document.get("customer_id") is not None else None,
+            "status": document.get("status") or ("pending" if document else None),
+            "updated_at": document.get("updated_at"),
+        }
+
+    async def _watch(self):
+        pipeline = [
+            {"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}},
+            {"$project": {"operationType": 1, "documentKey": 1, "fullDocument.customer_id": 1, "fullDocument.status": 1, "fullDocument.updated_at": 1}},
+        ]
+        while True:
+            try:
+                async with self.collection.watch(pipeline, full_document="updateLookup", resume_after=self.resume_token) as stream:
+                    logger.info("Watching %s for order events", self.collection.name)
+                    async for change in stream:
+                        self.resume_token = stream.resume_token
+                        self.publish(self._event(change))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if isinstance(e, errors.OperationFailure) and e.code == CHANGE_STREAM_HISTORY_LOST:
+                    self.resume_token = None
+                logger.error("Order change stream failed, retrying in %ss: %s", self.retry_seconds, e)
+                await asyncio.sleep(self.retry_seconds)
+
+def sse_message(data: dict, event_id: str = None, event: str = "order") -> str:
+    lines = [f"id: {event_id}"] if event_id else []
+    lines.append(f"event: {event}")
+    lines.append("data: " + orjson.dumps(data, default=bson_default).decode())
+    return "\n".join(lines) + "\n\n"
+
+def order_snapshot(order) -> dict:
+    return {
+        "operation": "snapshot",
+        "order_id": order.id,
+        "customer_id": order.customer_id,
+        "status": order.status,
+        "updated_at": order.updated_at,
+    }
+
+async def order_event_stream(subscription: Subscription, order, reload: Callable[[], Awaitable], heartbeat_seconds: float = 15.0):
+    try:
+        yield sse_message(order_snapshot(order))
+        status = order.status
+        while status not in TERMINAL_STATUSES:
+            if subscription.overflowed:
+                subscription.drain()
+                order = await reload()
+                status = order.status
+                yield sse_message(order_snapshot(order))
+                continue
+
+            try:
+                event = await subscription.get(heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            yield sse_message(event, event["id"])
+            if event["operation"] == "delete":
+                break
+            status = event["status"]
+    finally:
+        subscription.close()
+
+async def websocket_event_stream(websocket: WebSocket, subscription: Subscription):
+    receiver = asyncio.create_task(websocket.receive())
+    try:
+        while True:
+            getter = asyncio.create_task(subscription.queue.get())
+            done, _ = await asyncio.wait({receiver, getter}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                getter.cancel()
+                if receiver.result()["type"] == "websocket.disconnect":
+                    return
+                receiver = asyncio.create_task(websocket.receive())
+                continue
+
+            if subscription.overflowed:
+                subscription.overflowed = False
+                await websocket.send_text(orjson.dumps({"operation": "overflow"}).decode())
+            await websocket.send_text(orjson.dumps(getter.result(), default=bson_default).decode())
+    finally:
+        receiver.cancel()
+        subscription.close()
@@ -1,25 +1,45 @@
 import logging
-from app.api.services.sms_alert_service import SMSAlertService
+from app.api.services.outbox_service import OutboxService
 from bson.errors import InvalidId
 
-from app.api.models.order_model import OrderInDB, OrderCreate, OrderUpdate
+from app.api.models.order_model import CustomerSnapshot, OrderInDB, OrderCreate, OrderPage, OrderUpdate
 from bson import ObjectId
+from pymongo import ReturnDocument
 from datetime import datetime
 from fastapi import HTTPException
-from app.api.core.config import  settings
 from app.api.services.customer_service import CustomerService
+from app.api.services.write_coalescer import WriteCoalescer
+from app.api.services.stats_service import StatsService
+from app.api.core.log_config import SAMPLED
+from app.api.core.database import run_in_transaction
+from app.api.services.bulk_service import bulk_insert, validation_error
+from app.api.services.pagination import encode_cursor, keyset_filter, keyset_sort
+from app.api.services.export_service import export_csv_header, export_csv_row, export_ndjson_row
 
 logger = logging.getLogger(__name__)
 
+ORDER_PROJECTION = {"item": 1, "price": 1, "customer_id": 1, "status": 1, "created_at": 1, "updated_at": 1, "customer": 1}
+EXPORT_PROJECTION = {field: 1 for field in ORDER_PROJECTION if field != "customer"}
+
 class OrderService:
-    def __init__(self, db):
+    def __init__(
+        self,
+        db,
+        outbox: OutboxService,
+        customer_service: CustomerService = None,
+        order_writer: WriteCoalescer = None,
+        stats: StatsService = None,
+    ):
         self.db = db
-        self.sms_service = SMSAlertService(settings.africastalking_username, settings.africastalking_api_key)
-        self.customer_service = CustomerService(db)
+        self.outbox = outbox
+        self.customer_service = customer_service or CustomerService(db)
+        self.order_writer = order_writer
+        self.stats = stats or StatsService(db)
 
 
     async def create_order(self, order_data: OrderCreate):
         order_data_dict = order_data.dict()
+        order_data_dict['status'] = "pending"
         order_data_dict['created_at'] = datetime.utcnow()
         order_data_dict['updated_at'] = datetime.utcnow()
 
@@ -30,96 +50,290 @@ class OrderService:
         except InvalidId:
             raise HTTPException(status_code=400, detail="Provide a valid ObjectId. The one you've provided is NOT valid.")
 
+        customer = await self.customer_service.get_customer(order_data.customer_id)
+        order_data_dict['customer'] = {"full_name": customer.full_name, "phone_number": customer.phone_number}
+
         try:
-            logger.info(f"Creating new order with data: {order_data_dict}")
-            result = await self.db.orders.insert_one(order_data_dict)
-            order_id = result.inserted_id
-            logger.info(f"Order created successfully with ID: {order_id}")
-
-            customer = await self.customer_service.get_customer(order_data.customer_id)
-
-            message = (
-                f"Hello {customer.full_name}.\n \n"
-                f"Your order of {order_data.item} with ID number {str(order_id)} has been placed successfully.\n \n "
-                f"The total price is {order_data.price}. \n \n"
-                f"Thank you for your order. We appreciate your business!"
-            )
+            logger.debug("Creating new order with data: %s", order_data_dict)
+            if self.order_writer is not None:
+                order_id = await self.order_writer.insert(order_data_dict, after_insert=self._add_confirmations)
+            else:
+                async def insert(session):
+                    result = await self.db.orders.insert_one(order_data_dict, session=session)
+                    order_data_dict['_id'] = result.inserted_id
+                    await self._add_confirmations([order_data_dict], session)
+                    return result.inserted_id
 
-            self.sms_service.send_sms(customer.phone_number, message)
+                order_id = await run_in_transaction(self.db.client, insert)
+            self.outbox.wake()
+            logger.info("Order created successfully with ID: %s", order_id, extra=SAMPLED)
 
-            order_data_dict['_id'] = str(order_id)
-            order_data_dict['customer_id'] = str(order_data_dict['customer_id']) 
+            await self.stats.record_created([order_data_dict])
 
-            return OrderInDB(**order_data_dict)
+            order_data_dict['_id'] = order_id
+            return self._to_order(order_data_dict)
         except Exception as e:
-            logger.error(f"Error occurred while creating order: {str(e)}")
+            logger.error("Error occurred while creating order: %s", e)
             raise HTTPException(status_code=500, detail=str(e))
 
+    async def _add_confirmations(self, orders: list, session=None):
+        await self.outbox.add_sms_many([
+            (
+                order['_id'],
+                order['customer']['phone_number'],
+                self._confirmation_message(order['customer']['full_name'], order['item'], order['_id'], order['price']),
+            )
+            for order in orders
+        ], session=session)
+
+    def _confirmation_message(self, full_name: str, item: str, order_id, price: float):
+        return (
+            f"Hello {full_name}.\n \n"
+            f"Your order of {item} with ID number {str(order_id)} has been placed successfully.\n \n "
+            f"The total price is {price}. \n \n"
+            f"Thank you for your order. We appreciate your business!"
+        )
+
+    async def bulk_create_orders(self, rows, chunk_size: int = 1000, notify: bool = False):
+        customers = {}
+
+        async def prepare_chunk(chunk, result):
+            validated = []
+            for index, row in chunk:
+                try:
+                    if isinstance(row, Exception):
+                        raise row
+                    order_data_dict = OrderCreate(**row).dict()
+                    order_data_dict['customer_id'] = ObjectId(order_data_dict['customer_id'])
+                except InvalidId:
+                    result.error(index, "Invalid customer ID. Must be a valid ObjectId.")
+                    continue
+                except Exception as e:
+                    result.error(index, validation_error(e))
+                    continue
+                validated.append((index, order_data_dict))
+
+            customer_ids = list({order['customer_id'] for _, order in validated} - customers.keys())
+            if customer_ids:
+                cursor = self.db.customers.find(
+                    {"_id": {"$in": customer_ids}},
+                    {"full_name": 1, "phone_number": 1},
+                )
+                async for customer in cursor:
+                    customers[customer["_id"]] = customer
+
+            prepared = []
+            now = datetime.utcnow()
+            for index, order_data_dict in validated:
+                if order_data_dict['customer_id'] not in customers:
+                    result.error(index, "Customer NOT found.")
+                    continue
+                customer = customers[order_data_dict['customer_id']]
+                order_data_dict['customer'] = {"full_name": customer['full_name'], "phone_number": customer['phone_number']}
+                order_data_dict['status'] = "pending"
+                order_data_dict['created_at'] = now
+                order_data_dict['updated_at'] = now
+                prepared.append((index, order_data_dict))
+            return prepared
+
+        async def on_inserted(orders):
+            await self.stats.record_created(orders)
+            if notify:
+                await self._add_confirmations(orders)
+
+        return await bulk_insert(self.db.orders, rows, prepare_chunk, chunk_size, on_inserted)
+
+    def _to_order(self, order: dict) -> OrderInDB:
+        customer = order.get("customer")
+        return OrderInDB.model_construct(**{
+            **order,
+            "id": str(order["_id"]),
+            "customer_id": str(order["customer_id"]),
+            "status": order.get("status") or "pending",
+            "customer": CustomerSnapshot.model_construct(**customer) if customer else None,
+        })
+
+    def _order_query(
+        self,
+        customer_id: str = None,
+        status: str = None,
+        created_from: datetime = None,
+        created_to: datetime = None,
+        cursor: str = None,
+    ) -> dict:
+        filters = []
+        if customer_id:
+            if not ObjectId.is_valid(customer_id):
+                raise HTTPException(status_code=400, detail="Invalid customer ID. Must be a valid ObjectId.")
+            filters.append({"customer_id": ObjectId(customer_id)})
+        if status == "pending":
+            filters.append({"status": {"$in": ["pending", None]}})
+        elif status:
+            filters.append({"status": status})
+        if created_from or created_to:
+            created_at = {}
+            if created_from:
+                created_at["$gte"] = created_from
+            if created_to:
+                created_at["$lt"] = created_to
+            filters.append({"created_at": created_at})
+        if cursor:
+            filters.append(keyset_filter(cursor, "created_at"))
+
+        return {"$and": filters} if filters else {}
+
+    async def list_orders(
+        self,
+        customer_id: str = None,
+        status: str = None,
+        created_from: datetime = None,
+        created_to: datetime = None,
+        cursor: str = None,
+        limit: int = 50,
+    ):
+        query = self._order_query(customer_id, status, created_from, created_to, cursor)
+        logger.debug("Listing orders with query: %s", query)
+        documents = await self.db.orders.find(query, ORDER_PROJECTION).sort(keyset_sort("created_at")).limit(limit + 1).to_list(length=limit + 1)
+
+        next_cursor = encode_cursor(documents[limit - 1], "created_at") if len(documents) > limit else None
+        return OrderPage.model_construct(items=[self._to_order(order) for order in documents[:limit]], next_cursor=next_cursor)
+
+    def export_orders(
+        self,
+        format: str = "ndjson",
+        customer_id: str = None,
+        status: str = None,
+        created_from: datetime = None,
+        created_to: datetime = None,
+        batch_size: int = 1000,
+    ):
+        query = self._order_query(customer_id, status, created_from, created_to)
+        logger.info("Exporting orders as %s with query: %s", format, query)
+        return self._stream_orders(query, format, batch_size)
+
+    async def _stream_orders(self, query: dict, format: str, batch_size: int, flush_bytes: int = 64 * 1024):
+        serialize = export_csv_row if format == "csv" else export_ndjson_row
+        cursor = self.db.orders.find(query, EXPORT_PROJECTION, batch_size=batch_size).sort(keyset_sort("created_at"))
+        try:
+            buffer = [export_csv_header()] if format == "csv" else []
+            size = 0
+            async for order in cursor:
+                line = serialize(order)
+                buffer.append(line)
+                size += len(line)
+                if size >= flush_bytes:
+                    yield "".join(buffer)
+                    buffer = []
+                    size = 0
+            if buffer:
+                yield "".join(buffer)
+        finally:
+            await cursor.close()
+
     async def get_order(self, order_id: str):
         try:
             obj_id = ObjectId(order_id)
-            logger.info(f"Fetching order with ID: {order_id}")
+            logger.debug("Fetching order with ID: %s", order_id)
         except Exception:
-            logger.error(f"Invalid ObjectId provided: {order_id}")
+            logger.error("Invalid ObjectId provided: %s", order_id)
             raise HTTPException(status_code=400, detail="Invalid ObjectId provided.")
 
         try:
-            order = await self.db.orders.find_one({"_id": obj_id})
+            order = await self.db.orders.find_one({"_id": obj_id}, ORDER_PROJECTION)
             if order is None:
-                logger.warning(f"Order with ID {order_id} not found.")
-                raise HTTPException(status_code=404, detail="Order NOT found.")
-            order["_id"] = str(order["_id"])
-            logger.info(f"Order fetched successfully: {order}")
-            return OrderInDB(**order)
-
+                order = await self.db.orders_archive.find_one({"_id": obj_id}, ORDER_PROJECTION)
         except Exception as e:
-            logger.error(f"Error occurred while fetching order: {str(e)}")
+            logger.error("Error occurred while fetching order: %s", e)
             raise HTTPException(status_code=500, detail="An unexpected error occurred." + str(e))
 
-    async def update_order(self, order_id: str, update_data: OrderUpdate):
+        if order is None:
+            logger.warning("Order with ID %s not found.", order_id)
+            raise HTTPException(status_code=404, detail="Order NOT found.")
+        logger.debug("Order fetched successfully: %s", order)
+        return self._to_order(order)
+
+    async def get_order_modified(self, order_id: str):
         try:
             obj_id = ObjectId(order_id)
-            logger.info(f"Updating order with ID: {order_id}")
         except Exception:
-            logger.error(f"Invalid ObjectId provided for update: {order_id}")
+            logger.error("Invalid ObjectId provided: %s", order_id)
             raise HTTPException(status_code=400, detail="Invalid ObjectId provided.")
 
-        update_data_dict = update_data.dict(exclude_unset=True)
-        if update_data_dict:
-            update_data_dict['updated_at'] = datetime.utcnow()
+        projection = {"updated_at": 1, "created_at": 1, "customer.synced_at": 1}
+        order = await self.db.orders.find_one({"_id": obj_id}, projection)
+        if order is None:
+            order = await self.db.orders_archive.find_one({"_id": obj_id}, projection)
+        if order is None:
+            logger.warning("Order with ID %s not found.", order_id)
+            raise HTTPException(status_code=404, detail="Order NOT found.")
+        customer = order.get("customer") or {}
+        return max(filter(None, (order.get("updated_at") or order.get("created_at"), customer.get("synced_at"))), default=None)
 
-        try:
-            result = await self.db.orders.update_one({"_id": obj_id}, {"$set": update_data_dict})
+    def modified_at(self, order: OrderInDB):
+        # Customer snapshot refreshes change the representation without touching updated_at.
+        synced_at = order.customer.synced_at if order.customer is not None else None
+        return max(filter(None, (order.updated_at or order.created_at, synced_at)), default=None)
 
-            if result.modified_count == 0:
-                logger.warning(f"No modifications made or order not found with ID: {order_id}")
-                raise HTTPException(status_code=404, detail="Order NOT found or no changes made.")
+    async def update_order(self, order_id: str, update_data: OrderUpdate):
+        try:
+            obj_id = ObjectId(order_id)
+            logger.debug("Updating order with ID: %s", order_id)
+        except Exception:
+            logger.error("Invalid ObjectId provided for update: %s", order_id)
+            raise HTTPException(status_code=400, detail="Invalid ObjectId provided.")
 
-            logger.info(f"Order updated successfully. Fetching updated order.")
-            updated_order = await self.get_order(order_id)
-            return updated_order
+        update_data_dict = update_data.dict(exclude_unset=True)
 
+        try:
+            if update_data_dict:
+                update_data_dict['updated_at'] = datetime.utcnow()
+                previous = await self.db.orders.find_one_and_update(
+                    {"_id": obj_id},
+                    {"$set": update_data_dict},
+                    projection=ORDER_PROJECTION,
+                    return_document=ReturnDocument.BEFORE,
+                )
+                order = {**previous, **update_data_dict} if previous else None
+                if previous and ("price" in update_data_dict or "status" in update_data_dict):
+                    await self.stats.record_updated(previous, order)
+            else:
+                logger.debug("No changes to update for order ID: %s", order_id)
+                order = await self.db.orders.find_one({"_id": obj_id}, ORDER_PROJECTION)
         except Exception as e:
-            logger.error(f"Error occurred during order update: {str(e)}")
+            logger.error("Error occurred during order update: %s", e)
             raise HTTPException(status_code=500, detail=f"Error updating order: {str(e)}")
 
+        if order is None:
+            if await self.db.orders_archive.find_one({"_id": obj_id}, {"_id": 1}) is not None:
+                logger.warning("Order with ID %s is archived and can no longer be updated.", order_id)
+                raise HTTPException(status_code=409, detail="Order is archived and can no longer be updated.")
+            logger.warning("Order with ID %s not found.", order_id)
+            raise HTTPException(status_code=404, detail="Order NOT found.")
+
+        logger.debug("Order updated: %s", order)
+        logger.info("Order updated successfully with ID: %s", order_id, extra=SAMPLED)
+        return self._to_order(order)
+
     async def delete_order(self, order_id: str):
         try:
             obj_id = ObjectId(order_id)
-            logger.info(f"Deleting order with ID: {order_id}")
+            logger.debug("Deleting order with ID: %s", order_id)
         except Exception:
-            logger.error(f"Invalid ObjectId provided for deletion: {order_id}")
+            logger.error("Invalid ObjectId provided for deletion: %s", order_id)
             raise HTTPException(status_code=400, detail="Invalid ObjectId provided.")
 
         try:
-            result = await self.db.orders.delete_one({"_id": obj_id})
+            order = await self.db.orders.find_one_and_delete({"_id": obj_id})
+            if order is None:
+                order = await self.db.orders_archive.find_one_and_delete({"_id": obj_id})
+        except Exception as e:
+            logger.error("Error occurred while deleting order: %s", e)
+            raise HTTPException(status_code=500, detail=f"Error deleting order: {str(e)}")
 
-            if result.deleted_count == 0:
-                logger.warning(f"Order not found with ID: {order_id}")
-                raise HTTPException(status_code=404, detail="Order NOT found.")
-            logger.info(f"Order with ID {order_id} deleted successfully.")
-            return {"detail": "Order deleted successfully."}
+        if order is None:
+            logger.warning("Order not found with ID: %s", order_id)
+            raise HTTPException(status_code=404, detail="Order NOT found.")
 
-        except Exception as e:
-            logger.error(f"Error occurred while deleting order: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Error deleting order: {str(e)}")
\ No newline at end of file
+        await self.stats.record_deleted(order)
+        logger.info("Order with ID %s deleted successfully.", order_id, extra=SAMPLED)
+        return {"detail": "Order deleted successfully."}
\ No newline at end of file
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.api.services.sms_dispatch_service import SMSDispatchService, SMSNotification
+from app.api.core.log_config import SAMPLED
+
+logger = logging.getLogger(__name__)
+
+class OutboxService:
+    def __init__(
+        self,
+        db,
+        dispatcher: SMSDispatchService,
+        batch_size: int = 100,
+        poll_interval_seconds: float = 1.0,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 10,
+        retry_backoff_seconds: float = 5.0,
+        max_outstanding: int = 500,
+    ):
+        self.db = db
+        self.dispatcher = dispatcher
+        self.batch_size = batch_size
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.max_outstanding = max_outstanding
+        self.owner = f"{socket.gethostname()}-{os.getpid()}"
+        self._outstanding = 0
+        self._sent: list[dict] = []
+        self._failed: list[dict] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task = None
+
+    def _row(self, order_id: ObjectId, phone_number: str, message: str):
+        now = datetime.utcnow()
+        return {
+            "order_id": order_id,
+            "phone_number": phone_number,
+            "message": message,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+        }
+
+    async def add_sms_many(self, messages: list, session=None):
+        if not messages:
+            return
+        await self.db.outbox.insert_many([self._row(*message) for message in messages], ordered=False, session=session)
+        if session is None:
+            self.wake()
+
+    def wake(self):
+        self._wakeup.set()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._poll(), name="sms-outbox-poller")
+            logger.info("SMS outbox poller started as %s", self.owner)
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _poll(self):
+        while True:
+            try:
+                await self.flush_results()
+                claimed = await self.dispatch_batch()
+            except Exception as e:
+                logger.error("SMS outbox poll failed: %s", e)
+                claimed = 0
+
+            if claimed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def claim(self):
+        now = datetime.utcnow()
+        return await self.db.outbox.find_one_and_update(
+            {"status": {"$in": ["pending", "sending"]}, "next_attempt_at": {"$lte": now}},
+            {
+                "$set": {
+                    "status": "sending",
+                    "lease_owner": self.owner,
+                    "lease_id": ObjectId(),
+                    "next_attempt_at": now + timedelta(seconds=self.lease_seconds),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def dispatch_batch(self) -> int:
+        claimed = 0
+        # Rows waiting in the dispatch queue keep their lease running, so cap how many are claimed at once.
+        while claimed < self.batch_size and self._outstanding < self.max_outstanding:
+            row = await self.claim()
+            if row is None:
+                break
+            claimed += 1
+            self._outstanding += 1
+            await self.dispatcher.submit(SMSNotification(
+                row["phone_number"],
+                row["message"],
+                on_done=self._recorder(row),
+                before_send=self._lease_check(row),
+            ))
+
+        if claimed:
+            logger.info("Claimed %s SMS from the outbox", claimed, extra=SAMPLED)
+        return claimed
+
+    def _lease_check(self, row: dict):
+        async def renew(notification: SMSNotification) -> bool:
+            now = datetime.utcnow()
+            try:
+                result = await self.db.outbox.update_one(
+                    {"_id": row["_id"], "lease_id": row["lease_id"], "status": "sending", "next_attempt_at": {"$gt": now}},
+                    {"$set": {"next_attempt_at": now + timedelta(seconds=self.lease_seconds)}},
+                )
+                renewed = result.matched_count > 0
+            except Exception as e:
+                logger.error("Failed to renew lease on outbox SMS %s: %s", row["_id"], e)
+                renewed = False
+
+            if not renewed:
+                self._outstanding -= 1
+                logger.warning("Lease on outbox SMS %s expired before sending. Leaving it to the next claim", row["_id"])
+            return renewed
+
+        return renew
+
+    def _recorder(self, row: dict):
+        async def record(notification: SMSNotification, delivered: bool):
+            self._outstanding -= 1
+            if delivered:
+                self._sent.append(row)
+            else:
+                self._failed.append(row)
+            if len(self._sent) >= self.batch_size:
+                self._wakeup.set()
+
+        return record
+
+    async def flush_results(self):
+        sent, self._sent = self._sent, []
+        failed, self._failed = self._failed, []
+
+        if sent:
+            await self.db.outbox.update_many(
+                {"$or": [{"_id": row["_id"], "lease_id": row["lease_id"]} for row in sent]},
+                {"$set": {"status": "sent", "sent_at": datetime.utcnow()}, "$unset": {"lease_owner": "", "lease_id": ""}},
+            )
+
+        for row in failed:
+            if row["attempts"] >= self.max_attempts:
+                update = {"status": "failed"}
+                logger.error("Giving up on outbox SMS %s after %s attempts", row['_id'], row['attempts'])
+            else:
+                delay = self.retry_backoff_seconds * (2 ** (row["attempts"] - 1))
+                update = {"status": "pending", "next_attempt_at": datetime.utcnow() + timedelta(seconds=delay)}
+            await self.db.outbox.update_one(
+                {"_id": row["_id"], "lease_id": row["lease_id"]},
+                {"$set": update, "$unset": {"lease_owner": "", "lease_id": ""}},
+            )
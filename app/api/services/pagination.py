@@ -0,0 +1,38 @@
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+def encode_cursor(document: dict, sort_field: str = None) -> str:
+    payload = {"id": str(document["_id"])}
+    if sort_field:
+        payload[sort_field] = document[sort_field].isoformat()
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_field: str = None) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        decoded = {"_id": ObjectId(payload["id"])}
+        if sort_field:
+            decoded[sort_field] = datetime.fromisoformat(payload[sort_field])
+        return decoded
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+
+def keyset_filter(cursor: str, sort_field: str = None) -> dict:
+    position = decode_cursor(cursor, sort_field)
+    if not sort_field:
+        return {"_id": {"$lt": position["_id"]}}
+    return {
+        "$or": [
+            {sort_field: {"$lt": position[sort_field]}},
+            {sort_field: position[sort_field], "_id": {"$lt": position["_id"]}},
+        ]
+    }
+
+def keyset_sort(sort_field: str = None) -> list:
+    if not sort_field:
+        return [("_id", -1)]
+    return [(sort_field, -1), ("_id", -1)]
@@ -1,17 +1,29 @@
-import africastalking
 import logging
+import time
+from app.api.core.log_config import SAMPLED
+from app.api.core.metrics import sms_send_duration_seconds
 
 logger = logging.getLogger(__name__)
 
 class SMSAlertService:
     def __init__(self, username: str, api_key: str):
+        import africastalking
+
         africastalking.initialize(username, api_key)
         self.sms = africastalking.SMS
 
     def send_sms(self, phone_number: str, message: str):
+        return self.send_many(message, [phone_number])
+
+    def send_many(self, message: str, phone_numbers: list):
+        start = time.perf_counter()
         try:
-            response = self.sms.send(message, [phone_number])
-            logger.info(f"SMS sent successfully to {phone_number}: {response}")
+            response = self.sms.send(message, phone_numbers)
+            sms_send_duration_seconds.observe(time.perf_counter() - start, "success")
+            logger.info("SMS sent successfully to %s", ", ".join(phone_numbers), extra=SAMPLED)
+            logger.debug("SMS provider response: %s", response)
+            return response
         except Exception as e:
-            logger.error(f"Failed to send SMS to {phone_number}: {str(e)}")
-            raise e
\ No newline at end of file
+            sms_send_duration_seconds.observe(time.perf_counter() - start, "error")
+            logger.error("Failed to send SMS to %s: %s", ", ".join(phone_numbers), e)
+            raise e
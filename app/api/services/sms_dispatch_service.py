@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from app.api.services.circuit_breaker import CircuitOpenError
+from app.api.services.sms_providers import SMSProvider
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SMSNotification:
+    phone_number: str
+    message: str
+    attempts: int = 0
+    on_done: Optional[Callable[["SMSNotification", bool], Awaitable[None]]] = None
+    before_send: Optional[Callable[["SMSNotification"], Awaitable[bool]]] = None
+
+class SMSDispatchService:
+    def __init__(
+        self,
+        provider: SMSProvider,
+        workers: int = 4,
+        maxsize: int = 1000,
+        max_retries: int = 3,
+        retry_backoff_seconds: float = 0.5,
+        batch_size: int = 100,
+    ):
+        self.provider = provider
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self):
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(index), name=f"sms-dispatch-{index}")
+            for index in range(self.workers)
+        ]
+        logger.info("SMS dispatch started with %s workers", self.workers)
+
+    async def submit(self, notification: SMSNotification):
+        await self.queue.put(notification)
+
+    async def stop(self, timeout: float = 10.0):
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=timeout)
+            logger.info("SMS dispatch queue drained")
+        except asyncio.TimeoutError:
+            logger.warning("SMS dispatch queue NOT drained within %ss. %s SMS left unsent", timeout, self.queue.qsize())
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, index: int):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            try:
+                groups = {}
+                for notification in await self._sendable(batch):
+                    groups.setdefault(notification.message, []).append(notification)
+                for message, notifications in groups.items():
+                    await self._deliver(message, notifications)
+            except Exception as e:
+                logger.error("SMS dispatch worker %s failed to complete notifications: %s", index, e)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _sendable(self, batch: list) -> list:
+        async def allowed(notification: SMSNotification) -> bool:
+            return notification.before_send is None or await notification.before_send(notification)
+
+        results = await asyncio.gather(*(allowed(notification) for notification in batch))
+        return [notification for notification, ok in zip(batch, results) if ok]
+
+    async def _done(self, notification: SMSNotification, delivered: bool):
+        if notification.on_done is not None:
+            try:
+                await notification.on_done(notification, delivered)
+            except Exception as e:
+                logger.error("SMS delivery callback failed for %s: %s", notification.phone_number, e)
+
+    async def _deliver(self, message: str, notifications: list):
+        pending = notifications
+        while pending:
+            try:
+                results = await self.provider.send(message, [notification.phone_number for notification in pending])
+                error = "rejected by provider"
+            except CircuitOpenError:
+                logger.warning("Skipping %s SMS while the provider circuit is open", len(pending))
+                for notification in pending:
+                    await self._done(notification, False)
+                return
+            except Exception as e:
+                results = {}
+                error = e
+
+            retry = []
+            for notification in pending:
+                if results.get(notification.phone_number):
+                    await self._done(notification, True)
+                    continue
+                notification.attempts += 1
+                if notification.attempts > self.max_retries:
+                    logger.error("Giving up on SMS to %s after %s attempts: %s", notification.phone_number, notification.attempts, error)
+                    await self._done(notification, False)
+                else:
+                    retry.append(notification)
+
+            if retry:
+                attempts = max(notification.attempts for notification in retry)
+                delay = self.retry_backoff_seconds * (2 ** (attempts - 1))
+                logger.warning("Retrying %s SMS in %ss (attempt %s)", len(retry), delay, attempts)
+                await asyncio.sleep(delay)
+            pending = retry
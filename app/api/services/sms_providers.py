@@ -0,0 +1,109 @@
+import abc
+import asyncio
+import logging
+import time
+
+import httpx
+
+from app.api.core.log_config import SAMPLED
+from app.api.core.metrics import sms_send_duration_seconds
+from app.api.services.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+AFRICASTALKING_URL = "https://api.africastalking.com"
+AFRICASTALKING_SANDBOX_URL = "https://api.sandbox.africastalking.com"
+DELIVERED_STATUS_CODES = {100, 101, 102}
+
+class SMSProvider(abc.ABC):
+    @abc.abstractmethod
+    async def send(self, message: str, recipients: list) -> dict:
+        ...
+
+    async def close(self):
+        pass
+
+def recipient_results(response: dict, recipients: list) -> dict:
+    results = {phone_number: False for phone_number in recipients}
+    for recipient in response.get("SMSMessageData", {}).get("Recipients", []):
+        if recipient.get("number") in results:
+            results[recipient["number"]] = recipient.get("statusCode") in DELIVERED_STATUS_CODES or recipient.get("status") == "Success"
+    return results
+
+class AfricasTalkingSDKProvider(SMSProvider):
+    def __init__(self, sms_service, breaker: CircuitBreaker = None):
+        self.sms_service = sms_service
+        self.breaker = breaker or CircuitBreaker("sms")
+
+    async def send(self, message: str, recipients: list) -> dict:
+        self.breaker.before_call()
+        try:
+            response = await asyncio.to_thread(self.sms_service.send_many, message, recipients)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return recipient_results(response, recipients)
+
+class AfricasTalkingProvider(SMSProvider):
+    def __init__(
+        self,
+        username: str,
+        api_key: str,
+        base_url: str = None,
+        sender_id: str = None,
+        connect_timeout_seconds: float = 2.0,
+        timeout_seconds: float = 5.0,
+        max_connections: int = 20,
+        breaker: CircuitBreaker = None,
+        transport: httpx.AsyncBaseTransport = None,
+    ):
+        self.username = username
+        self.api_key = api_key
+        self.base_url = base_url or (AFRICASTALKING_SANDBOX_URL if username == "sandbox" else AFRICASTALKING_URL)
+        self.sender_id = sender_id
+        self.connect_timeout_seconds = connect_timeout_seconds
+        self.timeout_seconds = timeout_seconds
+        self.max_connections = max_connections
+        self.breaker = breaker or CircuitBreaker("sms")
+        self.transport = transport
+        self._client: httpx.AsyncClient = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"apiKey": self.api_key, "Accept": "application/json"},
+                timeout=httpx.Timeout(self.timeout_seconds, connect=self.connect_timeout_seconds, pool=self.connect_timeout_seconds),
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+                transport=self.transport,
+            )
+        return self._client
+
+    async def send(self, message: str, recipients: list) -> dict:
+        self.breaker.before_call()
+        form = {"username": self.username, "to": ",".join(recipients), "message": message}
+        if self.sender_id:
+            form["from"] = self.sender_id
+
+        start = time.perf_counter()
+        try:
+            response = await self.client.post("/version1/messaging", data=form)
+            response.raise_for_status()
+            results = recipient_results(response.json(), recipients)
+        except Exception as e:
+            self.breaker.record_failure()
+            sms_send_duration_seconds.observe(time.perf_counter() - start, "error")
+            logger.error("SMS provider call for %s recipients failed: %s", len(recipients), e)
+            raise
+
+        self.breaker.record_success()
+        sms_send_duration_seconds.observe(time.perf_counter() - start, "success")
+        logger.info("SMS sent to %s of %s recipients", sum(results.values()), len(recipients), extra=SAMPLED)
+        return results
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import sys
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import UpdateOne
+
+from app.api.models.report_model import CustomerOrderSummary, DailySales
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ("pending", "completed", "cancelled")
+
+def _contribution(order: dict) -> dict:
+    status = order.get("status") or "pending"
+    return {
+        "order_count": 1,
+        "spend": 0 if status == "cancelled" else order["price"],
+        status: 1,
+    }
+
+def _day(order: dict) -> str:
+    return order["created_at"].strftime("%Y-%m-%d")
+
+class StatsService:
+    def __init__(self, db):
+        self.db = db
+
+    def _increments(self, delta: dict, spend_field: str) -> dict:
+        increments = {}
+        for key, value in delta.items():
+            if value:
+                increments[spend_field if key == "spend" else key] = value
+        return increments
+
+    async def _apply(self, deltas: list):
+        customer_ops = []
+        daily_ops = []
+        now = datetime.utcnow()
+        for order, delta in deltas:
+            customer_inc = self._increments(delta, "total_spend")
+            if customer_inc:
+                customer_ops.append(UpdateOne(
+                    {"_id": order["customer_id"]},
+                    {"$inc": customer_inc, "$set": {"updated_at": now}},
+                    upsert=True,
+                ))
+            daily_inc = self._increments(delta, "revenue")
+            if daily_inc:
+                daily_ops.append(UpdateOne(
+                    {"_id": _day(order)},
+                    {"$inc": daily_inc, "$set": {"updated_at": now}},
+                    upsert=True,
+                ))
+
+        try:
+            if customer_ops:
+                await self.db.customer_order_stats.bulk_write(customer_ops, ordered=False)
+            if daily_ops:
+                await self.db.daily_sales.bulk_write(daily_ops, ordered=False)
+        except Exception as e:
+            logger.error("Failed to update order rollups, run a stats rebuild to repair them: %s", e)
+
+    async def record_created(self, orders: list):
+        await self._apply([(order, _contribution(order)) for order in orders])
+
+    async def record_updated(self, before: dict, after: dict):
+        old = _contribution(before)
+        new = _contribution(after)
+        delta = {key: new.get(key, 0) - old.get(key, 0) for key in old.keys() | new.keys()}
+        await self._apply([(after, delta)])
+
+    async def record_deleted(self, order: dict):
+        delta = {key: -value for key, value in _contribution(order).items()}
+        await self._apply([(order, delta)])
+
+    async def get_customer_summary(self, customer_id: str):
+        if not ObjectId.is_valid(customer_id):
+            raise HTTPException(status_code=400, detail="Provide a valid ObjectId. The one you've provided is NOT valid.")
+
+        stats = await self.db.customer_order_stats.find_one({"_id": ObjectId(customer_id)}) or {}
+        stats.pop("_id", None)
+        stats.pop("updated_at", None)
+        return CustomerOrderSummary(customer_id=customer_id, **stats)
+
+    async def get_daily_sales(self, date_from: str = None, date_to: str = None):
+        query = {}
+        if date_from or date_to:
+            query["_id"] = {}
+            if date_from:
+                query["_id"]["$gte"] = date_from
+            if date_to:
+                query["_id"]["$lte"] = date_to
+
+        days = []
+        async for day in self.db.daily_sales.find(query).sort("_id", 1):
+            day.pop("updated_at", None)
+            days.append(DailySales(date=day.pop("_id"), **day))
+        return days
+
+    async def rebuild(self):
+        status_counts = {
+            status: {"$sum": {"$cond": [{"$eq": [{"$ifNull": ["$status", "pending"]}, status]}, 1, 0]}}
+            for status in STATUSES
+        }
+        spend = {"$sum": {"$cond": [{"$eq": ["$status", "cancelled"]}, 0, "$price"]}}
+        now = datetime.utcnow()
+
+        await self.db.orders.aggregate([
+            {"$unionWith": "orders_archive"},
+            {"$group": {"_id": "$customer_id", "order_count": {"$sum": 1}, "total_spend": spend, **status_counts}},
+            {"$set": {"updated_at": now}},
+            {"$out": "customer_order_stats"},
+        ]).to_list(length=None)
+
+        await self.db.orders.aggregate([
+            {"$unionWith": "orders_archive"},
+            {"$group": {
+                "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}},
+                "order_count": {"$sum": 1},
+                "revenue": spend,
+                **status_counts,
+            }},
+            {"$set": {"updated_at": now}},
+            {"$out": "daily_sales"},
+        ]).to_list(length=None)
+
+        logger.info("Rebuilt customer_order_stats and daily_sales from orders and orders_archive")
+
+async def main():
+    from app.api.core.database import connect_to_mongo, close_mongo_connection
+
+    db = connect_to_mongo()
+    try:
+        await StatsService(db).rebuild()
+    finally:
+        close_mongo_connection()
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        print("Usage: python -m app.api.services.stats_service rebuild")
+        sys.exit(1)
+    asyncio.run(main())
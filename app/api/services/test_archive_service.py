@@ -0,0 +1,74 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from app.api.services.archive_service import OrderArchiver
+
+def old_order(status="completed"):
+    created_at = datetime.utcnow() - timedelta(days=100)
+    return {"_id": ObjectId.from_datetime(created_at), "status": status, "created_at": created_at, "updated_at": created_at}
+
+def mock_batches(mock_db, *batches):
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.to_list = AsyncMock(side_effect=list(batches))
+    mock_db.orders.find = MagicMock(return_value=cursor)
+    return cursor
+
+@pytest.fixture
+def mock_db():
+    db = MagicMock()
+    db.orders_archive.insert_many = AsyncMock()
+    db.orders_archive.delete_many = AsyncMock()
+    db.orders.delete_one = AsyncMock(return_value=MagicMock(deleted_count=1))
+    return db
+
+@pytest.mark.asyncio
+async def test_archive_moves_terminal_orders_in_id_ranges(mock_db):
+    first, second = [old_order(), old_order("cancelled")], [old_order()]
+    mock_batches(mock_db, first, second)
+    archiver = OrderArchiver(mock_db, age_seconds=90 * 24 * 60 * 60, batch_size=2, max_orders_per_second=0)
+
+    assert await archiver.archive() == 3
+
+    queries = [call.args[0] for call in mock_db.orders.find.call_args_list]
+    assert queries[0]["status"] == {"$in": ["completed", "cancelled"]}
+    assert "$gt" not in queries[0]["_id"]
+    assert queries[1]["_id"]["$gt"] == first[-1]["_id"]
+    assert queries[0]["_id"]["$lt"].generation_time.replace(tzinfo=None) < datetime.utcnow() - timedelta(days=89)
+    mock_db.orders_archive.insert_many.assert_any_await(first, ordered=False)
+    assert [call.args[0]["_id"] for call in mock_db.orders.delete_one.await_args_list] == [order["_id"] for order in first + second]
+    mock_db.orders_archive.delete_many.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_archive_tolerates_orders_already_copied(mock_db):
+    orders = [old_order()]
+    mock_batches(mock_db, orders)
+    mock_db.orders_archive.insert_many.side_effect = BulkWriteError({"writeErrors": [{"index": 0, "code": 11000, "errmsg": "E11000"}]})
+    archiver = OrderArchiver(mock_db, age_seconds=60, batch_size=10)
+
+    assert await archiver.archive() == 1
+
+@pytest.mark.asyncio
+async def test_orders_changed_while_archiving_drop_their_copies(mock_db):
+    # The second order was updated and the third deleted after being copied.
+    orders = [old_order(), old_order(), old_order()]
+    mock_batches(mock_db, orders)
+    mock_db.orders.delete_one.side_effect = [MagicMock(deleted_count=1), MagicMock(deleted_count=0), MagicMock(deleted_count=0)]
+    archiver = OrderArchiver(mock_db, age_seconds=60, batch_size=10)
+
+    assert await archiver.archive() == 1
+
+    mock_db.orders_archive.delete_many.assert_awaited_once_with({"_id": {"$in": [orders[1]["_id"], orders[2]["_id"]]}})
+
+@pytest.mark.asyncio
+async def test_archive_stops_on_other_write_errors(mock_db):
+    mock_batches(mock_db, [old_order()])
+    mock_db.orders_archive.insert_many.side_effect = BulkWriteError({"writeErrors": [{"index": 0, "code": 121, "errmsg": "validation"}]})
+    archiver = OrderArchiver(mock_db, age_seconds=60)
+
+    with pytest.raises(BulkWriteError):
+        await archiver.archive()
+    mock_db.orders.delete_one.assert_not_awaited()
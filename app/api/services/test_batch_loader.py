@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from app.api.services.batch_loader import BatchLoader
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_share_one_batch():
+    load_many = AsyncMock(side_effect=lambda keys: {key: key.upper() for key in keys if key != "missing"})
+    loader = BatchLoader(load_many)
+
+    results = await asyncio.gather(loader.load("a"), loader.load("b"), loader.load("a"), loader.load("missing"))
+
+    assert results == ["A", "B", "A", None]
+    load_many.assert_awaited_once_with(["a", "b", "missing"])
+
+@pytest.mark.asyncio
+async def test_loads_join_inflight_batch():
+    release = asyncio.Event()
+
+    async def load_many(keys):
+        await release.wait()
+        return {key: key for key in keys}
+
+    loader = BatchLoader(AsyncMock(side_effect=load_many))
+    first = asyncio.create_task(loader.load("a"))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(loader.load("a"))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(first, second) == ["a", "a"]
+    assert loader.load_many.await_count == 1
+
+@pytest.mark.asyncio
+async def test_max_batch_dispatches_immediately():
+    load_many = AsyncMock(side_effect=lambda keys: {key: key for key in keys})
+    loader = BatchLoader(load_many, max_batch=2)
+
+    await asyncio.gather(*(loader.load(key) for key in "abc"))
+
+    assert [call.args[0] for call in load_many.await_args_list] == [["a", "b"], ["c"]]
+
+@pytest.mark.asyncio
+async def test_batch_errors_reach_every_caller():
+    loader = BatchLoader(AsyncMock(side_effect=RuntimeError("down")))
+
+    results = await asyncio.gather(loader.load("a"), loader.load("b"), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+@pytest.mark.asyncio
+async def test_forget_starts_a_new_load_for_later_callers():
+    release = asyncio.Event()
+    values = iter(["old", "new"])
+
+    async def load_many(keys):
+        value = next(values)
+        await release.wait()
+        return {key: value for key in keys}
+
+    loader = BatchLoader(AsyncMock(side_effect=load_many))
+    first = asyncio.create_task(loader.load("a"))
+    await asyncio.sleep(0.01)
+    loader.forget("a")
+    second = asyncio.create_task(loader.load("a"))
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert await asyncio.gather(first, second) == ["old", "new"]
+    assert loader._inflight == {}
@@ -0,0 +1,101 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from app.api.services.bulk_service import read_bulk_rows
+from app.api.services.customer_service import CustomerService
+from app.api.services.order_service import OrderService
+
+@pytest.fixture
+def mock_db():
+    return MagicMock()
+
+async def as_rows(rows):
+    for row in rows:
+        yield row
+
+def sample_customer(email="ganji@jaba.com"):
+    return {"full_name": "Jaba Ganji", "email_address": email, "phone_number": "+254791111111"}
+
+def assign_ids(documents, ordered):
+    for document in documents:
+        document.setdefault("_id", ObjectId())
+
+
+class FakeRequest:
+    def __init__(self, content_type, chunks):
+        self.headers = {"content-type": content_type}
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+@pytest.mark.asyncio
+async def test_read_bulk_rows_parses_ndjson_across_chunks():
+    request = FakeRequest("application/x-ndjson", [b'{"a": 1}\n{"a"', b': 2}\nnot json\n{"a": 3}'])
+
+    rows = [row async for row in read_bulk_rows(request)]
+
+    assert rows[0] == {"a": 1}
+    assert rows[1] == {"a": 2}
+    assert isinstance(rows[2], ValueError)
+    assert rows[3] == {"a": 3}
+
+@pytest.mark.asyncio
+async def test_bulk_create_customers_inserts_in_chunks(mock_db):
+    mock_db.customers.insert_many = AsyncMock(side_effect=assign_ids)
+    service = CustomerService(mock_db)
+
+    rows = [sample_customer(f"ganji{i}@jaba.com") for i in range(5)]
+    result = await service.bulk_create_customers(as_rows(rows), chunk_size=2)
+
+    assert result["inserted"] == 5
+    assert result["failed"] == 0
+    assert mock_db.customers.insert_many.call_count == 3
+    assert mock_db.customers.insert_many.call_args.kwargs["ordered"] is False
+
+@pytest.mark.asyncio
+async def test_bulk_create_customers_reports_duplicates_and_invalid_rows(mock_db):
+    def insert_many(documents, ordered):
+        assign_ids(documents, ordered)
+        raise BulkWriteError({"writeErrors": [
+            {"index": 1, "code": 11000, "errmsg": "E11000", "keyValue": {"email_address": "ganji@jaba.com"}},
+        ]})
+
+    mock_db.customers.insert_many = AsyncMock(side_effect=insert_many)
+    service = CustomerService(mock_db)
+
+    rows = [sample_customer(), {"full_name": "No Email"}, sample_customer()]
+    result = await service.bulk_create_customers(as_rows(rows), chunk_size=10)
+
+    assert result["inserted"] == 1
+    assert result["failed"] == 2
+    assert [row["status"] for row in result["results"]] == ["inserted", "error", "error"]
+    assert "email_address" in result["results"][1]["error"]
+    assert result["results"][2]["error"] == "Duplicate key: email_address=ganji@jaba.com"
+
+@pytest.mark.asyncio
+async def test_bulk_create_orders_rejects_unknown_customers(mock_db):
+    known_customer = ObjectId()
+
+    cursor = MagicMock()
+    cursor.__aiter__.return_value = [{"_id": known_customer, "full_name": "Jaba Ganji", "phone_number": "+254791111111"}]
+    mock_db.customers.find = MagicMock(return_value=cursor)
+    mock_db.orders.insert_many = AsyncMock(side_effect=assign_ids)
+    outbox = MagicMock()
+    outbox.add_sms_many = AsyncMock()
+    service = OrderService(mock_db, outbox)
+
+    rows = [
+        {"item": "Pizza", "price": 10, "customer_id": str(known_customer)},
+        {"item": "Pizza", "price": 10, "customer_id": str(ObjectId())},
+        {"item": "Pizza", "price": 10, "customer_id": "invalid"},
+    ]
+    result = await service.bulk_create_orders(as_rows(rows), chunk_size=10, notify=True)
+
+    assert result["inserted"] == 1
+    assert result["results"][1]["error"] == "Customer NOT found."
+    assert result["results"][2]["error"] == "Invalid customer ID. Must be a valid ObjectId."
+    assert len(outbox.add_sms_many.call_args.args[0]) == 1
@@ -0,0 +1,50 @@
+from unittest.mock import patch
+from app.api.services.cache_service import TTLCache
+
+def test_get_returns_cached_value():
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+def test_expired_entry_is_a_miss():
+    cache = TTLCache(maxsize=2, ttl_seconds=10)
+    with patch("app.api.services.cache_service.time.monotonic", return_value=100):
+        cache.set("a", 1)
+    with patch("app.api.services.cache_service.time.monotonic", return_value=111):
+        assert cache.get("a") is None
+
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+def test_invalidate_removes_entry():
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.invalidate("a")
+
+    assert cache.get("a") is None
+    assert cache.stats()["invalidations"] == 1
+
+def test_set_skips_values_loaded_before_an_invalidation():
+    cache = TTLCache()
+    generation = cache.generation
+    cache.invalidate("a")
+    cache.set("a", 1, generation)
+
+    assert cache.get("a") is None
+    cache.set("a", 2, cache.generation)
+    assert cache.get("a") == 2
@@ -1,9 +1,11 @@
+import asyncio
 import pytest
 from fastapi import HTTPException
 from app.api.models.customer_model import CustomerInDB, CustomerUpdate
 from datetime import datetime
 from pymongo.errors import DuplicateKeyError
 from app.api.services.customer_service import CustomerService
+from app.api.services.cache_service import TTLCache
 from unittest.mock import AsyncMock, MagicMock
 from bson import ObjectId
 
@@ -79,6 +81,116 @@ async def test_get_customer_not_found(customer_service, mock_db):
     assert exc_info.value.status_code == 404
     assert exc_info.value.detail == "Customer NOT found."
 
+@pytest.mark.asyncio
+async def test_get_customer_reads_through_cache(mock_db):
+    customer_service = CustomerService(mock_db, TTLCache())
+    customer_id = str(ObjectId())
+
+    mock_db.customers.find_one = AsyncMock(side_effect=lambda query, projection=None: {
+        "_id": ObjectId(customer_id),
+        "full_name": "Ganji Doe",
+        "email_address": "john@example.com",
+        "phone_number": "+254791111111",
+        "created_at": datetime.utcnow(),
+    })
+
+    first = await customer_service.get_customer(customer_id)
+    second = await customer_service.get_customer(customer_id)
+
+    assert first.email_address == second.email_address
+    assert mock_db.customers.find_one.call_count == 1
+
+@pytest.mark.asyncio
+async def test_load_racing_an_update_is_not_cached(mock_db):
+    cache = TTLCache()
+    customer_service = CustomerService(mock_db, cache)
+    customer_id = str(ObjectId())
+    release = asyncio.Event()
+
+    async def find_one(query, projection=None):
+        await release.wait()
+        return {"_id": ObjectId(customer_id), "full_name": "Ganji Doe", "email_address": "old@example.com", "phone_number": "+254791111111", "created_at": datetime.utcnow()}
+
+    mock_db.customers.find_one = AsyncMock(side_effect=find_one)
+    load = asyncio.create_task(customer_service.get_customer(customer_id))
+    await asyncio.sleep(0.01)
+    customer_service._invalidate(ObjectId(customer_id))
+    release.set()
+    await load
+
+    assert cache.get(customer_id) is None
+
+@pytest.mark.asyncio
+async def test_delete_customer_invalidates_cache(mock_db):
+    cache = TTLCache()
+    customer_service = CustomerService(mock_db, cache)
+    customer_id = str(ObjectId())
+    cache.set(customer_id, MagicMock())
+
+    mock_db.customers.delete_one = AsyncMock(return_value=MagicMock(deleted_count=1))
+
+    await customer_service.delete_customer(customer_id)
+
+    assert cache.get(customer_id) is None
+
+@pytest.mark.asyncio
+async def test_update_customer_single_round_trip(customer_service, mock_db):
+    customer_id = str(ObjectId())
+
+    mock_db.customers.find_one_and_update = AsyncMock(return_value={
+        "_id": ObjectId(customer_id),
+        "full_name": "Past Gandi",
+        "email_address": "new_email@example.com",
+        "phone_number": "+254791111111",
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    })
+    mock_db.customers.find_one = AsyncMock()
+
+    result = await customer_service.update_customer(customer_id, CustomerUpdate(email_address="new_email@example.com"))
+
+    assert result.email_address == "new_email@example.com"
+    assert mock_db.customers.find_one_and_update.call_count == 1
+    assert not mock_db.customers.find_one.called
+
+@pytest.mark.asyncio
+async def test_update_customer_duplicate_email(customer_service, mock_db):
+    mock_db.customers.find_one_and_update = AsyncMock(side_effect=DuplicateKeyError("Duplicate email"))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await customer_service.update_customer(str(ObjectId()), CustomerUpdate(email_address="taken@example.com"))
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == "Email address already exists."
+
+@pytest.mark.asyncio
+async def test_update_customer_missing_returns_404(customer_service, mock_db):
+    customer_id = str(ObjectId())
+    mock_db.customers.find_one_and_update = AsyncMock(return_value=None)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await customer_service.update_customer(customer_id, CustomerUpdate(full_name="Past Gandi"))
+
+    assert exc_info.value.status_code == 404
+    assert exc_info.value.detail == f"Customer with ID: {customer_id} NOT found."
+
+@pytest.mark.asyncio
+async def test_update_customer_without_changes_returns_current(customer_service, mock_db):
+    customer_id = str(ObjectId())
+    mock_db.customers.find_one = AsyncMock(return_value={
+        "_id": ObjectId(customer_id),
+        "full_name": "Past Gandi",
+        "email_address": "old_email@example.com",
+        "phone_number": "+254791111111",
+        "created_at": datetime.utcnow(),
+    })
+    mock_db.customers.find_one_and_update = AsyncMock()
+
+    result = await customer_service.update_customer(customer_id, CustomerUpdate())
+
+    assert result.email_address == "old_email@example.com"
+    assert not mock_db.customers.find_one_and_update.called
+
 """
 @pytest.mark.asyncio
 async def test_update_customer_success(customer_service, mock_db):
@@ -92,7 +204,7 @@ async def test_update_customer_success(customer_service, mock_db):
         "created_at": datetime.utcnow()
     }
 
-    mock_db.customers.find_one = AsyncMock(side_effect=lambda query: existing_customer_data if query.get("_id") == existing_customer_data["_id"] else None)
+    mock_db.customers.find_one = AsyncMock(side_effect=lambda query, projection=None: existing_customer_data if query.get("_id") == existing_customer_data["_id"] else None)
 
     async def mock_check_email(query):
         if query.get("email_address") == "new_email@example.com":
@@ -192,4 +304,166 @@ async def test_delete_customer_unexpected_error(customer_service, mock_db):
         await customer_service.delete_customer(customer_id)
 
     assert exc_info.value.status_code == 500
-    assert "An unexpected error occurred" in exc_info.value.detail
\ No newline at end of file
+    assert "An unexpected error occurred" in exc_info.value.detail
+@pytest.mark.asyncio
+async def test_concurrent_get_customer_calls_share_one_query(customer_service, mock_db):
+    customer_id = ObjectId()
+    mock_db.customers.find_one = AsyncMock(return_value={
+        "_id": customer_id,
+        "full_name": "Ganji Doe",
+        "email_address": "john@example.com",
+        "phone_number": "+254791111111",
+        "created_at": datetime.utcnow(),
+    })
+
+    results = await asyncio.gather(*(customer_service.get_customer(str(customer_id)) for _ in range(5)))
+
+    assert {result.id for result in results} == {str(customer_id)}
+    mock_db.customers.find_one.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_get_customers_uses_one_in_query(customer_service, mock_db):
+    found, missing = ObjectId(), ObjectId()
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=[{
+        "_id": found,
+        "full_name": "Ganji Doe",
+        "email_address": "john@example.com",
+        "phone_number": "+254791111111",
+        "created_at": datetime.utcnow(),
+    }])
+    mock_db.customers.find = MagicMock(return_value=cursor)
+
+    result = await customer_service.get_customers([str(found), str(missing), str(found)])
+
+    assert [customer.id for customer in result.items] == [str(found)]
+    assert result.missing == [str(missing)]
+    assert mock_db.customers.find.call_args.args[0] == {"_id": {"$in": [found, missing]}}
+
+@pytest.mark.asyncio
+async def test_get_customers_rejects_invalid_ids(customer_service):
+    with pytest.raises(HTTPException) as exc_info:
+        await customer_service.get_customers(["not-an-id"])
+    assert exc_info.value.status_code == 400
+
+@pytest.mark.asyncio
+async def test_update_customer_refreshes_order_snapshots(customer_service, mock_db):
+    customer_id = ObjectId()
+    updated_at = datetime.utcnow()
+    mock_db.customers.find_one_and_update = AsyncMock(return_value={
+        "_id": customer_id,
+        "full_name": "Past Gandi",
+        "email_address": "john@example.com",
+        "phone_number": "+254791111111",
+        "created_at": datetime.utcnow(),
+        "updated_at": updated_at,
+    })
+    mock_db.orders.update_many = AsyncMock(return_value=MagicMock(modified_count=3))
+
+    await customer_service.update_customer(str(customer_id), CustomerUpdate(full_name="Past Gandi"))
+    await customer_service.close()
+
+    mock_db.orders.update_many.assert_awaited_once_with(
+        {"customer_id": customer_id, "customer.synced_at": {"$not": {"$gt": updated_at}}},
+        {"$set": {"customer": {"full_name": "Past Gandi", "phone_number": "+254791111111", "synced_at": updated_at}}},
+    )
+
+@pytest.mark.asyncio
+async def test_update_customer_email_does_not_touch_orders(customer_service, mock_db):
+    mock_db.customers.find_one_and_update = AsyncMock(return_value={
+        "_id": ObjectId(),
+        "full_name": "Past Gandi",
+        "email_address": "new_email@example.com",
+        "phone_number": "+254791111111",
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    })
+    mock_db.orders.update_many = AsyncMock()
+
+    await customer_service.update_customer(str(ObjectId()), CustomerUpdate(email_address="new_email@example.com"))
+    await customer_service.close()
+
+    mock_db.orders.update_many.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_create_customer_stores_normalized_name(customer_service, mock_db):
+    inserted = []
+    mock_db.customers.insert_one = AsyncMock(side_effect=lambda document: inserted.append(dict(document)) or MagicMock(inserted_id=ObjectId()))
+
+    result = await customer_service.create_customer({**sample_customer_data(), "full_name": "  Jaba   GANJI "})
+
+    assert inserted[0]["name_lower"] == "jaba ganji"
+    assert "name_lower" not in result.__dict__
+
+@pytest.mark.asyncio
+async def test_update_customer_keeps_normalized_name_in_sync(customer_service, mock_db):
+    mock_db.customers.find_one_and_update = AsyncMock(return_value={**sample_customer_data(), "_id": ObjectId(), "updated_at": datetime.utcnow()})
+    mock_db.orders.update_many = AsyncMock(return_value=MagicMock(modified_count=0))
+
+    await customer_service.update_customer(str(ObjectId()), CustomerUpdate(full_name="Past Gandi"))
+    await customer_service.close()
+
+    assert mock_db.customers.find_one_and_update.await_args.args[1]["$set"]["name_lower"] == "past gandi"
+
+def search_cursor(documents):
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.to_list = AsyncMock(return_value=documents)
+    return cursor
+
+@pytest.mark.asyncio
+async def test_search_customers_by_name_prefix_and_phone(customer_service, mock_db):
+    cursor = search_cursor([{**sample_customer_data(), "_id": ObjectId()}])
+    mock_db.customers.find = MagicMock(return_value=cursor)
+
+    result = await customer_service.search_customers(name="JABA g", phone="+254 791-111", limit=5)
+
+    query = mock_db.customers.find.call_args.args[0]
+    assert query == {"phone_number": {"$regex": r"^\+254791111"}, "name_lower": {"$regex": r"^jaba\ g"}}
+    cursor.sort.assert_called_once_with([("name_lower", 1), ("_id", 1)])
+    cursor.limit.assert_called_once_with(5)
+    assert result.items[0].full_name == "Jaba Ganji"
+
+@pytest.mark.asyncio
+async def test_search_customers_by_text_sorts_by_score(customer_service, mock_db):
+    cursor = search_cursor([])
+    mock_db.customers.find = MagicMock(return_value=cursor)
+
+    await customer_service.search_customers(text="ganji", email="Ganji@JABA.com")
+
+    query, projection = mock_db.customers.find.call_args.args
+    assert query == {"email_address": "Ganji@jaba.com", "$text": {"$search": "ganji"}}
+    assert projection["score"] == {"$meta": "textScore"}
+    cursor.sort.assert_called_once_with([("score", {"$meta": "textScore"}), ("_id", 1)])
+
+@pytest.mark.asyncio
+async def test_search_customers_requires_a_term(customer_service):
+    for terms in ({}, {"name": "   "}, {"phone": "abc"}):
+        with pytest.raises(HTTPException) as exc_info:
+            await customer_service.search_customers(**terms)
+        assert exc_info.value.status_code == 400
+
+class BackfillCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def batch_size(self, size):
+        return self
+
+    async def __aiter__(self):
+        for document in self.documents:
+            yield document
+
+@pytest.mark.asyncio
+async def test_backfill_sets_missing_normalized_names(customer_service, mock_db):
+    customers = [{"_id": ObjectId(), "full_name": f"Customer {index}"} for index in range(3)]
+    mock_db.customers.find = MagicMock(return_value=BackfillCursor(customers))
+    mock_db.customers.bulk_write = AsyncMock(side_effect=lambda batch, ordered: MagicMock(modified_count=len(batch)))
+
+    assert await customer_service.backfill_search_fields(batch_size=2) == 3
+
+    batches = [call.args[0] for call in mock_db.customers.bulk_write.await_args_list]
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert batches[1][0]._doc == {"$set": {"name_lower": "customer 2"}}
+    assert batches[1][0]._filter == {"_id": customers[2]["_id"], "name_lower": None}
@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+from unittest.mock import AsyncMock
+from app.api.services.idempotency_service import IdempotencyService
+
+class FakeKeys:
+    def __init__(self):
+        self.documents = {}
+
+    async def insert_one(self, document):
+        if document["key"] in self.documents:
+            raise DuplicateKeyError("duplicate key")
+        self.documents[document["key"]] = dict(document)
+
+    async def find_one(self, query):
+        document = self.documents.get(query["key"])
+        return dict(document) if document else None
+
+    async def find_one_and_update(self, query, update, return_document=None):
+        document = self.documents.get(query["key"])
+        if document is None or document["status"] != query["status"] or document["locked_until"] != query["locked_until"]:
+            return None
+        document.update(update["$set"])
+        return dict(document)
+
+    async def update_one(self, query, update):
+        self.documents[query["key"]].update(update["$set"])
+
+    async def delete_one(self, query):
+        document = self.documents.get(query["key"])
+        if document is not None and document["status"] == query["status"]:
+            del self.documents[query["key"]]
+
+@pytest.fixture
+def service():
+    return IdempotencyService(SimpleNamespace(idempotency_keys=FakeKeys()), wait_seconds=1.0, poll_interval_seconds=0.01)
+
+@pytest.mark.asyncio
+async def test_replays_stored_response(service):
+    handler = AsyncMock(return_value={"id": "order-1"})
+
+    first = await service.execute("key-1", {"item": "Pizza"}, handler)
+    second = await service.execute("key-1", {"item": "Pizza"}, handler)
+
+    handler.assert_awaited_once()
+    assert second.body == first.body
+    assert second.headers["Idempotent-Replayed"] == "true"
+
+@pytest.mark.asyncio
+async def test_rejects_key_reused_with_different_payload(service):
+    await service.execute("key-1", {"item": "Pizza"}, AsyncMock(return_value={"id": "order-1"}))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await service.execute("key-1", {"item": "Burger"}, AsyncMock())
+    assert exc_info.value.status_code == 422
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_wait_for_first_request(service):
+    calls = 0
+
+    async def handler():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"id": "order-1"}
+
+    responses = await asyncio.gather(*(service.execute("key-1", {"item": "Pizza"}, handler) for _ in range(3)))
+
+    assert calls == 1
+    assert len({response.body for response in responses}) == 1
+
+@pytest.mark.asyncio
+async def test_failed_request_releases_key(service):
+    with pytest.raises(HTTPException):
+        await service.execute("key-1", {"item": "Pizza"}, AsyncMock(side_effect=HTTPException(status_code=404)))
+
+    handler = AsyncMock(return_value={"id": "order-1"})
+    await service.execute("key-1", {"item": "Pizza"}, handler)
+    handler.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_key_is_kept_when_storing_the_response_fails(service):
+    service.collection.update_one = AsyncMock(side_effect=Exception("connection reset"))
+
+    response = await service.execute("key-1", {"item": "Pizza"}, AsyncMock(return_value={"id": "order-1"}))
+
+    assert response.status_code == 200
+    assert service.collection.documents["key-1"]["status"] == "in_progress"
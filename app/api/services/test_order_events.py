@@ -0,0 +1,92 @@
+import asyncio
+import json
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from bson import ObjectId
+from app.api.services.order_events import OrderEventHub, order_event_stream, websocket_event_stream
+
+@pytest.fixture
+def hub():
+    hub = OrderEventHub(SimpleNamespace(name="orders"), queue_size=2)
+    hub.start = lambda: None
+    return hub
+
+def event(order_id="o1", customer_id="c1", status="completed", operation="update"):
+    return {"id": "token", "operation": operation, "order_id": order_id, "customer_id": customer_id, "status": status, "updated_at": None}
+
+def test_change_is_mapped_to_event(hub):
+    order_id, customer_id = ObjectId(), ObjectId()
+    change = {
+        "_id": {"_data": "8264"},
+        "operationType": "update",
+        "documentKey": {"_id": order_id},
+        "fullDocument": {"customer_id": customer_id, "status": "completed", "updated_at": datetime(2024, 5, 1)},
+    }
+
+    assert hub._event(change) == {
+        "id": "8264",
+        "operation": "update",
+        "order_id": str(order_id),
+        "customer_id": str(customer_id),
+        "status": "completed",
+        "updated_at": datetime(2024, 5, 1),
+    }
+
+def test_publish_fans_out_by_order_and_customer(hub):
+    by_order = hub.subscribe(order_id="o1")
+    by_customer = hub.subscribe(customer_id="c1")
+    other = hub.subscribe(order_id="o2")
+
+    hub.publish(event())
+
+    assert by_order.queue.qsize() == 1
+    assert by_customer.queue.qsize() == 1
+    assert other.queue.qsize() == 0
+
+    by_order.close()
+    assert hub.subscriber_count() == 2
+
+def test_slow_subscriber_is_marked_overflowed(hub):
+    subscription = hub.subscribe(order_id="o1")
+    for _ in range(3):
+        hub.publish(event(status="pending"))
+
+    assert subscription.overflowed
+    subscription.drain()
+    assert subscription.queue.empty() and not subscription.overflowed
+
+@pytest.mark.asyncio
+async def test_sse_stream_ends_on_terminal_status(hub):
+    subscription = hub.subscribe(order_id="o1")
+    order = SimpleNamespace(id="o1", customer_id="c1", status="pending", updated_at=None)
+    hub.publish(event())
+
+    messages = [message async for message in order_event_stream(subscription, order, AsyncMock(), heartbeat_seconds=1)]
+
+    assert json.loads(messages[0].split("data: ")[1])["operation"] == "snapshot"
+    assert messages[1].startswith("id: token\nevent: order\n")
+    assert json.loads(messages[1].split("data: ")[1])["status"] == "completed"
+    assert hub.subscriber_count() == 0
+
+@pytest.mark.asyncio
+async def test_websocket_stream_forwards_until_disconnect(hub):
+    subscription = hub.subscribe(customer_id="c1")
+    disconnect = asyncio.Event()
+    sent = []
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "websocket.disconnect"}
+
+    async def send_text(text):
+        sent.append(json.loads(text))
+        disconnect.set()
+
+    websocket = SimpleNamespace(receive=receive, send_text=send_text)
+    hub.publish(event())
+    await asyncio.wait_for(websocket_event_stream(websocket, subscription), 1)
+
+    assert sent[0]["order_id"] == "o1"
+    assert hub.subscriber_count() == 0
@@ -0,0 +1,331 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from app.api.models.order_model import OrderCreate, OrderInDB, OrderUpdate
+from app.api.services.order_service import OrderService
+from app.api.services.pagination import decode_cursor, encode_cursor
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+
+@pytest.fixture
+def mock_db():
+    return MagicMock()
+
+@pytest.fixture
+def order_service(mock_db):
+    return OrderService(mock_db, MagicMock(), stats=AsyncMock())
+
+def sample_order(created_at=None):
+    return {
+        "_id": ObjectId(),
+        "item": "Pizza",
+        "price": 10.0,
+        "customer_id": ObjectId(),
+        "status": "pending",
+        "created_at": created_at or datetime.utcnow(),
+        "updated_at": datetime.utcnow(),
+    }
+
+def mock_transactions(mock_db):
+    session = MagicMock()
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=False)
+
+    async def with_transaction(callback):
+        return await callback(session)
+
+    session.with_transaction = with_transaction
+    mock_db.client.start_session = AsyncMock(return_value=session)
+    return session
+
+def mock_find(mock_db, documents):
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.to_list = AsyncMock(return_value=documents)
+    mock_db.orders.find = MagicMock(return_value=cursor)
+    return cursor
+
+
+@pytest.mark.asyncio
+async def test_get_order_success(order_service, mock_db):
+    order = sample_order()
+    mock_db.orders.find_one = AsyncMock(return_value=dict(order))
+
+    result = await order_service.get_order(str(order["_id"]))
+
+    assert isinstance(result, OrderInDB)
+    assert result.id == str(order["_id"])
+    assert result.customer_id == str(order["customer_id"])
+
+@pytest.mark.asyncio
+async def test_get_order_modified_reads_only_timestamps(order_service, mock_db):
+    order = sample_order()
+    mock_db.orders.find_one = AsyncMock(return_value={"_id": order["_id"], "updated_at": order["updated_at"]})
+
+    assert await order_service.get_order_modified(str(order["_id"])) == order["updated_at"]
+    mock_db.orders.find_one.assert_awaited_once_with({"_id": order["_id"]}, {"updated_at": 1, "created_at": 1, "customer.synced_at": 1})
+
+@pytest.mark.asyncio
+async def test_get_order_modified_tracks_customer_snapshot_refresh(order_service, mock_db):
+    order = sample_order()
+    synced_at = order["updated_at"] + timedelta(minutes=5)
+    mock_db.orders.find_one = AsyncMock(return_value={"_id": order["_id"], "updated_at": order["updated_at"], "customer": {"synced_at": synced_at}})
+
+    assert await order_service.get_order_modified(str(order["_id"])) == synced_at
+
+def test_modified_at_matches_get_order_modified(order_service):
+    order = sample_order()
+    synced_at = order["updated_at"] + timedelta(minutes=5)
+    order["customer"] = {"full_name": "Past Gandi", "phone_number": "+254791111111", "synced_at": synced_at}
+
+    assert order_service.modified_at(order_service._to_order(order)) == synced_at
+
+@pytest.mark.asyncio
+async def test_get_order_modified_not_found(order_service, mock_db):
+    mock_db.orders.find_one = AsyncMock(return_value=None)
+    mock_db.orders_archive.find_one = AsyncMock(return_value=None)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await order_service.get_order_modified(str(ObjectId()))
+    assert exc_info.value.status_code == 404
+
+@pytest.mark.asyncio
+async def test_get_order_invalid_id(order_service):
+    with pytest.raises(HTTPException) as exc_info:
+        await order_service.get_order("invalid_id")
+
+    assert exc_info.value.status_code == 400
+
+@pytest.mark.asyncio
+async def test_update_order_single_round_trip(order_service, mock_db):
+    order = sample_order()
+    order["status"] = "completed"
+    mock_db.orders.find_one_and_update = AsyncMock(return_value=order)
+    mock_db.orders.find_one = AsyncMock()
+
+    result = await order_service.update_order(str(order["_id"]), OrderUpdate(status="completed"))
+
+    assert result.status == "completed"
+    assert mock_db.orders.find_one_and_update.call_args.args[1]["$set"]["status"] == "completed"
+    assert not mock_db.orders.find_one.called
+
+@pytest.mark.asyncio
+async def test_update_order_not_found(order_service, mock_db):
+    mock_db.orders.find_one_and_update = AsyncMock(return_value=None)
+    mock_db.orders_archive.find_one = AsyncMock(return_value=None)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await order_service.update_order(str(ObjectId()), OrderUpdate(status="completed"))
+
+    assert exc_info.value.status_code == 404
+
+@pytest.mark.asyncio
+async def test_list_orders_returns_next_cursor_when_more_pages(order_service, mock_db):
+    now = datetime.utcnow().replace(microsecond=0)
+    orders = [sample_order(now - timedelta(minutes=i)) for i in range(3)]
+    expected = {"_id": orders[1]["_id"], "created_at": orders[1]["created_at"]}
+    cursor = mock_find(mock_db, orders)
+
+    page = await order_service.list_orders(limit=2)
+
+    assert len(page.items) == 2
+    assert decode_cursor(page.next_cursor, "created_at") == expected
+    cursor.limit.assert_called_once_with(3)
+    cursor.sort.assert_called_once_with([("created_at", -1), ("_id", -1)])
+
+@pytest.mark.asyncio
+async def test_list_orders_last_page_has_no_cursor(order_service, mock_db):
+    mock_find(mock_db, [sample_order()])
+
+    page = await order_service.list_orders(limit=2)
+
+    assert len(page.items) == 1
+    assert page.next_cursor is None
+
+@pytest.mark.asyncio
+async def test_list_orders_applies_filters_and_keyset(order_service, mock_db):
+    mock_find(mock_db, [])
+    first_page_last = sample_order()
+    customer_id = str(ObjectId())
+
+    await order_service.list_orders(customer_id=customer_id, status="completed", cursor=encode_cursor(first_page_last, "created_at"))
+
+    query, projection = mock_db.orders.find.call_args.args
+    assert {"customer_id": ObjectId(customer_id)} in query["$and"]
+    assert {"status": "completed"} in query["$and"]
+    assert "$or" in query["$and"][-1]
+    assert "item" in projection
+
+@pytest.mark.asyncio
+async def test_list_orders_invalid_cursor(order_service, mock_db):
+    mock_find(mock_db, [])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await order_service.list_orders(cursor="not-a-cursor")
+
+    assert exc_info.value.status_code == 400
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+        self.closed = False
+
+    def sort(self, *args):
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_export_orders_streams_ndjson(order_service, mock_db):
+    orders = [sample_order(), sample_order()]
+    cursor = FakeCursor(orders)
+    mock_db.orders.find = MagicMock(return_value=cursor)
+
+    chunks = [chunk async for chunk in order_service.export_orders("ndjson", batch_size=500)]
+
+    lines = "".join(chunks).splitlines()
+    assert len(lines) == 2
+    assert f'"id":"{orders[0]["_id"]}"' in lines[0]
+    assert mock_db.orders.find.call_args.kwargs["batch_size"] == 500
+    assert cursor.closed
+
+@pytest.mark.asyncio
+async def test_export_orders_streams_csv_with_header(order_service, mock_db):
+    mock_db.orders.find = MagicMock(return_value=FakeCursor([sample_order()]))
+
+    chunks = [chunk async for chunk in order_service.export_orders("csv")]
+
+    lines = "".join(chunks).splitlines()
+    assert lines[0] == "item,price,customer_id,id,status,created_at,updated_at"
+    assert lines[1].startswith("Pizza,10.0,")
+
+def test_export_orders_rejects_invalid_filters_before_streaming(order_service):
+    with pytest.raises(HTTPException):
+        order_service.export_orders("ndjson", customer_id="invalid")
+
+@pytest.mark.asyncio
+async def test_update_order_status_updates_rollups(order_service, mock_db):
+    order = sample_order()
+    mock_db.orders.find_one_and_update = AsyncMock(return_value=order)
+
+    await order_service.update_order(str(order["_id"]), OrderUpdate(status="completed"))
+
+    before, after = order_service.stats.record_updated.call_args.args
+    assert before["status"] == "pending"
+    assert after["status"] == "completed"
+
+@pytest.mark.asyncio
+async def test_delete_order_updates_rollups(order_service, mock_db):
+    order = sample_order()
+    mock_db.orders.find_one_and_delete = AsyncMock(return_value=order)
+
+    result = await order_service.delete_order(str(order["_id"]))
+
+    assert result == {"detail": "Order deleted successfully."}
+    order_service.stats.record_deleted.assert_called_once_with(order)
+
+@pytest.mark.asyncio
+async def test_delete_order_not_found(order_service, mock_db):
+    mock_db.orders.find_one_and_delete = AsyncMock(return_value=None)
+    mock_db.orders_archive.find_one_and_delete = AsyncMock(return_value=None)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await order_service.delete_order(str(ObjectId()))
+
+    assert exc_info.value.status_code == 404
+
+@pytest.mark.asyncio
+async def test_create_order_embeds_customer_snapshot(mock_db):
+    customer_service = MagicMock()
+    customer_service.get_customer = AsyncMock(return_value=MagicMock(full_name="Ganji Doe", phone_number="+254791111111"))
+    order_service = OrderService(mock_db, MagicMock(add_sms_many=AsyncMock()), customer_service, stats=AsyncMock())
+    mock_transactions(mock_db)
+    mock_db.orders.insert_one = AsyncMock(return_value=MagicMock(inserted_id=ObjectId()))
+
+    result = await order_service.create_order(OrderCreate(item="Pizza", price=10.0, customer_id=str(ObjectId())))
+
+    inserted = mock_db.orders.insert_one.call_args.args[0]
+    assert inserted["customer"] == {"full_name": "Ganji Doe", "phone_number": "+254791111111"}
+    assert result.customer.full_name == "Ganji Doe"
+
+@pytest.mark.asyncio
+async def test_create_order_writes_order_and_sms_in_one_transaction(mock_db):
+    customer_service = MagicMock()
+    customer_service.get_customer = AsyncMock(return_value=MagicMock(full_name="Ganji Doe", phone_number="+254791111111"))
+    outbox = MagicMock(add_sms_many=AsyncMock())
+    order_service = OrderService(mock_db, outbox, customer_service, stats=AsyncMock())
+    session = mock_transactions(mock_db)
+    order_id = ObjectId()
+
+    async def insert_one(document, session):
+        document["_id"] = order_id
+        return MagicMock(inserted_id=order_id)
+
+    mock_db.orders.insert_one = AsyncMock(side_effect=insert_one)
+
+    await order_service.create_order(OrderCreate(item="Pizza", price=10.0, customer_id=str(ObjectId())))
+
+    assert mock_db.orders.insert_one.call_args.kwargs["session"] is session
+    [(sms_order_id, phone_number, message)] = outbox.add_sms_many.call_args.args[0]
+    assert (sms_order_id, phone_number) == (order_id, "+254791111111")
+    assert outbox.add_sms_many.call_args.kwargs["session"] is session
+    outbox.wake.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_create_order_fails_when_sms_cannot_be_queued(mock_db):
+    customer_service = MagicMock()
+    customer_service.get_customer = AsyncMock(return_value=MagicMock(full_name="Ganji Doe", phone_number="+254791111111"))
+    outbox = MagicMock(add_sms_many=AsyncMock(side_effect=Exception("outbox unavailable")))
+    stats = AsyncMock()
+    order_service = OrderService(mock_db, outbox, customer_service, stats=stats)
+    mock_transactions(mock_db)
+    mock_db.orders.insert_one = AsyncMock(return_value=MagicMock(inserted_id=ObjectId()))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await order_service.create_order(OrderCreate(item="Pizza", price=10.0, customer_id=str(ObjectId())))
+
+    assert exc_info.value.status_code == 500
+    stats.record_created.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_get_order_falls_back_to_archive(order_service, mock_db):
+    order = sample_order()
+    order["status"] = "completed"
+    mock_db.orders.find_one = AsyncMock(return_value=None)
+    mock_db.orders_archive.find_one = AsyncMock(return_value=order)
+
+    result = await order_service.get_order(str(order["_id"]))
+
+    assert result.id == str(order["_id"])
+    assert result.status == "completed"
+
+@pytest.mark.asyncio
+async def test_get_order_missing_everywhere_returns_404(order_service, mock_db):
+    mock_db.orders.find_one = AsyncMock(return_value=None)
+    mock_db.orders_archive.find_one = AsyncMock(return_value=None)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await order_service.get_order(str(ObjectId()))
+
+    assert exc_info.value.status_code == 404
+
+@pytest.mark.asyncio
+async def test_update_archived_order_is_rejected(order_service, mock_db):
+    order_id = ObjectId()
+    mock_db.orders.find_one_and_update = AsyncMock(return_value=None)
+    mock_db.orders_archive.find_one = AsyncMock(return_value={"_id": order_id})
+
+    with pytest.raises(HTTPException) as exc_info:
+        await order_service.update_order(str(order_id), OrderUpdate(status="pending"))
+
+    assert exc_info.value.status_code == 409
@@ -0,0 +1,140 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from app.api.services.outbox_service import OutboxService
+from app.api.services.sms_dispatch_service import SMSNotification
+
+@pytest.fixture
+def mock_db():
+    return MagicMock()
+
+@pytest.fixture
+def dispatcher():
+    dispatcher = MagicMock()
+    dispatcher.submit = AsyncMock()
+    return dispatcher
+
+@pytest.fixture
+def outbox(mock_db, dispatcher):
+    return OutboxService(mock_db, dispatcher, batch_size=10, max_attempts=3)
+
+def sample_row(attempts=1):
+    return {
+        "_id": ObjectId(),
+        "order_id": ObjectId(),
+        "phone_number": "+254712345678",
+        "message": "Hello!",
+        "status": "sending",
+        "lease_owner": "worker-1",
+        "lease_id": ObjectId(),
+        "attempts": attempts,
+        "next_attempt_at": datetime.utcnow(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_add_sms_many_writes_pending_rows(outbox, mock_db):
+    mock_db.outbox.insert_many = AsyncMock()
+    session = object()
+
+    await outbox.add_sms_many([(ObjectId(), "+254712345678", "Hello!")], session=session)
+
+    [row] = mock_db.outbox.insert_many.call_args.args[0]
+    assert row["status"] == "pending"
+    assert row["attempts"] == 0
+    assert mock_db.outbox.insert_many.call_args.kwargs["session"] is session
+    assert not outbox._wakeup.is_set()
+
+@pytest.mark.asyncio
+async def test_dispatch_batch_claims_until_outbox_is_empty(outbox, mock_db, dispatcher):
+    mock_db.outbox.find_one_and_update = AsyncMock(side_effect=[sample_row(), sample_row(), None])
+
+    claimed = await outbox.dispatch_batch()
+
+    assert claimed == 2
+    assert dispatcher.submit.call_count == 2
+    assert mock_db.outbox.find_one_and_update.call_args.args[1]["$set"]["lease_owner"] == outbox.owner
+
+@pytest.mark.asyncio
+async def test_dispatch_batch_stops_at_batch_size(mock_db, dispatcher):
+    outbox = OutboxService(mock_db, dispatcher, batch_size=2)
+    mock_db.outbox.find_one_and_update = AsyncMock(side_effect=lambda *args, **kwargs: sample_row())
+
+    claimed = await outbox.dispatch_batch()
+
+    assert claimed == 2
+
+@pytest.mark.asyncio
+async def test_dispatch_batch_caps_outstanding_claims(mock_db, dispatcher):
+    outbox = OutboxService(mock_db, dispatcher, batch_size=10, max_outstanding=3)
+    mock_db.outbox.find_one_and_update = AsyncMock(side_effect=lambda *args, **kwargs: sample_row())
+
+    assert await outbox.dispatch_batch() == 3
+    assert await outbox.dispatch_batch() == 0
+
+    notification = dispatcher.submit.call_args.args[0]
+    await notification.on_done(notification, True)
+    assert await outbox.dispatch_batch() == 1
+
+@pytest.mark.asyncio
+async def test_lease_is_renewed_before_sending(outbox, mock_db, dispatcher):
+    mock_db.outbox.find_one_and_update = AsyncMock(side_effect=[sample_row(), None])
+    mock_db.outbox.update_one = AsyncMock(return_value=MagicMock(matched_count=1))
+    await outbox.dispatch_batch()
+    notification = dispatcher.submit.call_args.args[0]
+
+    assert await notification.before_send(notification)
+    query, update = mock_db.outbox.update_one.call_args.args
+    assert set(query) == {"_id", "lease_id", "status", "next_attempt_at"}
+    assert update["$set"]["next_attempt_at"] > datetime.utcnow()
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_not_sent(outbox, mock_db, dispatcher):
+    mock_db.outbox.find_one_and_update = AsyncMock(side_effect=[sample_row(), None])
+    mock_db.outbox.update_one = AsyncMock(return_value=MagicMock(matched_count=0))
+    await outbox.dispatch_batch()
+    notification = dispatcher.submit.call_args.args[0]
+
+    assert not await notification.before_send(notification)
+    assert outbox._outstanding == 0
+
+@pytest.mark.asyncio
+async def test_delivered_rows_are_marked_sent_in_one_write(outbox, mock_db, dispatcher):
+    rows = [sample_row(), sample_row()]
+    mock_db.outbox.find_one_and_update = AsyncMock(side_effect=rows + [None])
+    mock_db.outbox.update_many = AsyncMock()
+
+    await outbox.dispatch_batch()
+    for call in dispatcher.submit.call_args_list:
+        notification = call.args[0]
+        await notification.on_done(notification, True)
+    await outbox.flush_results()
+
+    mock_db.outbox.update_many.assert_called_once()
+    query, update = mock_db.outbox.update_many.call_args.args
+    assert query == {"$or": [{"_id": row["_id"], "lease_id": row["lease_id"]} for row in rows]}
+    assert update["$set"]["status"] == "sent"
+
+@pytest.mark.asyncio
+async def test_failed_row_is_rescheduled(outbox, mock_db):
+    mock_db.outbox.update_one = AsyncMock()
+    row = sample_row(attempts=1)
+
+    await outbox._recorder(row)(SMSNotification(row["phone_number"], row["message"]), False)
+    await outbox.flush_results()
+
+    update = mock_db.outbox.update_one.call_args.args[1]
+    assert update["$set"]["status"] == "pending"
+    assert update["$set"]["next_attempt_at"] > datetime.utcnow()
+
+@pytest.mark.asyncio
+async def test_failed_row_gives_up_after_max_attempts(outbox, mock_db):
+    mock_db.outbox.update_one = AsyncMock()
+    row = sample_row(attempts=3)
+
+    await outbox._recorder(row)(SMSNotification(row["phone_number"], row["message"]), False)
+    await outbox.flush_results()
+
+    update = mock_db.outbox.update_one.call_args.args[1]
+    assert update["$set"]["status"] == "failed"
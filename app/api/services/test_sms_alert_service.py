@@ -8,27 +8,26 @@ class TestSMSAlertService(unittest.TestCase):
         self.api_key = "test_api_key"
         self.service = SMSAlertService(self.username, self.api_key)
 
-    @patch('app.api.services.sms_alert_service.africastalking.SMS.send')
-    def test_send_sms_success(self, mock_send):
-        mock_send.return_value = {"status": "success", "messageId": "12345"}
+    def test_send_sms_success(self):
+        with patch.object(self.service.sms, "send") as mock_send:
+            mock_send.return_value = {"status": "success", "messageId": "12345"}
 
-        phone_number = "+254712345678"
-        message = "Hello, this is a test message!"
+            phone_number = "+254712345678"
+            message = "Hello, this is a test message!"
 
-        self.service.send_sms(phone_number, message)
-
-        mock_send.assert_called_once_with(message, [phone_number])
+            self.service.send_sms(phone_number, message)
 
-    @patch('app.api.services.sms_alert_service.africastalking.SMS.send')
-    def test_send_sms_failure(self, mock_send):
+            mock_send.assert_called_once_with(message, [phone_number])
 
-        mock_send.side_effect = Exception("API Error")
+    def test_send_sms_failure(self):
+        with patch.object(self.service.sms, "send") as mock_send:
+            mock_send.side_effect = Exception("API Error")
 
-        phone_number = "+254712345678"
-        message = "This will fail!"
+            phone_number = "+254712345678"
+            message = "This will fail!"
 
-        with self.assertRaises(Exception) as context:
-            self.service.send_sms(phone_number, message)
+            with self.assertRaises(Exception) as context:
+                self.service.send_sms(phone_number, message)
 
         self.assertEqual(str(context.exception), "API Error")
 
@@ -0,0 +1,138 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from app.api.services.circuit_breaker import CircuitOpenError
+from app.api.services.sms_dispatch_service import SMSDispatchService, SMSNotification
+
+def delivered(message, recipients):
+    return {phone_number: True for phone_number in recipients}
+
+@pytest.fixture
+def provider():
+    return AsyncMock(send=AsyncMock(side_effect=delivered))
+
+@pytest.mark.asyncio
+async def test_submit_sends_sms_off_request_path(provider):
+    dispatcher = SMSDispatchService(provider, workers=2)
+    dispatcher.start()
+
+    await dispatcher.submit(SMSNotification("+254712345678", "Hello!"))
+
+    await dispatcher.stop(timeout=1)
+
+    provider.send.assert_awaited_once_with("Hello!", ["+254712345678"])
+
+@pytest.mark.asyncio
+async def test_submit_waits_for_room_when_queue_is_full(provider):
+    dispatcher = SMSDispatchService(provider, workers=1, maxsize=1)
+    await dispatcher.submit(SMSNotification("+254712345678", "First"))
+
+    second = asyncio.create_task(dispatcher.submit(SMSNotification("+254712345678", "Second")))
+    await asyncio.sleep(0)
+    assert not second.done()
+
+    dispatcher.start()
+    await second
+    await dispatcher.stop(timeout=1)
+
+    assert provider.send.await_count == 2
+
+@pytest.mark.asyncio
+async def test_identical_messages_are_batched_into_one_send(provider):
+    dispatcher = SMSDispatchService(provider, workers=1)
+    await dispatcher.submit(SMSNotification("+254700000001", "Offer"))
+    await dispatcher.submit(SMSNotification("+254700000002", "Offer"))
+    await dispatcher.submit(SMSNotification("+254700000003", "Personal"))
+
+    dispatcher.start()
+    await dispatcher.stop(timeout=1)
+
+    assert [call.args for call in provider.send.await_args_list] == [
+        ("Offer", ["+254700000001", "+254700000002"]),
+        ("Personal", ["+254700000003"]),
+    ]
+
+@pytest.mark.asyncio
+async def test_failed_sms_is_retried_with_backoff(provider):
+    provider.send.side_effect = [Exception("API Error"), {"+254712345678": True}]
+    dispatcher = SMSDispatchService(provider, workers=1, retry_backoff_seconds=0)
+    dispatcher.start()
+
+    await dispatcher.submit(SMSNotification("+254712345678", "Hello!"))
+    await dispatcher.stop(timeout=1)
+
+    assert provider.send.await_count == 2
+
+@pytest.mark.asyncio
+async def test_only_rejected_recipients_are_retried(provider):
+    provider.send.side_effect = [{"+254700000001": True, "+254700000002": False}, {"+254700000002": True}]
+    dispatcher = SMSDispatchService(provider, workers=1, retry_backoff_seconds=0)
+    await dispatcher.submit(SMSNotification("+254700000001", "Offer"))
+    await dispatcher.submit(SMSNotification("+254700000002", "Offer"))
+
+    dispatcher.start()
+    await dispatcher.stop(timeout=1)
+
+    assert provider.send.await_args_list[1].args == ("Offer", ["+254700000002"])
+
+@pytest.mark.asyncio
+async def test_failed_sms_gives_up_after_max_retries(provider):
+    provider.send.side_effect = Exception("API Error")
+    dispatcher = SMSDispatchService(provider, workers=1, max_retries=2, retry_backoff_seconds=0)
+    dispatcher.start()
+
+    await dispatcher.submit(SMSNotification("+254712345678", "Hello!"))
+    await dispatcher.stop(timeout=1)
+
+    assert provider.send.await_count == 3
+    assert dispatcher.queue.empty()
+
+@pytest.mark.asyncio
+async def test_on_done_reports_delivery_outcome(provider):
+    provider.send.side_effect = Exception("API Error")
+    dispatcher = SMSDispatchService(provider, workers=1, max_retries=0)
+    outcomes = []
+
+    async def on_done(notification, delivered):
+        outcomes.append(delivered)
+
+    dispatcher.start()
+    await dispatcher.submit(SMSNotification("+254712345678", "Hello!", on_done=on_done))
+    await dispatcher.stop(timeout=1)
+
+    assert outcomes == [False]
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_without_retries(provider):
+    provider.send.side_effect = CircuitOpenError("sms circuit is open")
+    dispatcher = SMSDispatchService(provider, workers=1, max_retries=3, retry_backoff_seconds=10)
+    outcomes = []
+
+    async def on_done(notification, delivered):
+        outcomes.append((delivered, notification.attempts))
+
+    dispatcher.start()
+    await dispatcher.submit(SMSNotification("+254712345678", "Hello!", on_done=on_done))
+    await dispatcher.stop(timeout=1)
+
+    assert outcomes == [(False, 0)]
+    provider.send.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_notifications_rejected_before_send_are_dropped(provider):
+    dispatcher = SMSDispatchService(provider, workers=1)
+    outcomes = []
+
+    async def on_done(notification, delivered):
+        outcomes.append(notification.phone_number)
+
+    async def before_send(notification):
+        return notification.phone_number != "+254700000002"
+
+    await dispatcher.submit(SMSNotification("+254700000001", "Offer", on_done=on_done, before_send=before_send))
+    await dispatcher.submit(SMSNotification("+254700000002", "Offer", on_done=on_done, before_send=before_send))
+    dispatcher.start()
+    await dispatcher.stop(timeout=1)
+
+    provider.send.assert_awaited_once_with("Offer", ["+254700000001"])
+    assert outcomes == ["+254700000001"]
@@ -0,0 +1,78 @@
+import httpx
+import pytest
+from unittest.mock import MagicMock
+from urllib.parse import parse_qs
+from app.api.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.api.services.sms_providers import AfricasTalkingProvider, AfricasTalkingSDKProvider, recipient_results
+
+def provider_for(handler, breaker=None):
+    return AfricasTalkingProvider("sandbox", "key", base_url="http://fake-sms", breaker=breaker, transport=httpx.MockTransport(handler))
+
+def accept_all(request):
+    form = parse_qs(request.content.decode())
+    recipients = [{"number": number, "status": "Success", "statusCode": 101} for number in form["to"][0].split(",")]
+    return httpx.Response(201, json={"SMSMessageData": {"Recipients": recipients}})
+
+@pytest.mark.asyncio
+async def test_sends_one_request_for_many_recipients():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return accept_all(request)
+
+    provider = provider_for(handler)
+    results = await provider.send("Offer", ["+254700000001", "+254700000002"])
+    await provider.close()
+
+    assert results == {"+254700000001": True, "+254700000002": True}
+    assert len(requests) == 1
+    assert requests[0].headers["apiKey"] == "key"
+    assert parse_qs(requests[0].content.decode())["to"] == ["+254700000001,+254700000002"]
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_repeated_failures():
+    breaker = CircuitBreaker("sms", failure_threshold=2, reset_seconds=60)
+    provider = provider_for(lambda request: httpx.Response(503), breaker)
+
+    for _ in range(2):
+        with pytest.raises(httpx.HTTPStatusError):
+            await provider.send("Hello!", ["+254700000001"])
+    with pytest.raises(CircuitOpenError):
+        await provider.send("Hello!", ["+254700000001"])
+    await provider.close()
+
+    assert breaker.state == "open"
+
+def test_circuit_half_opens_for_a_single_probe():
+    breaker = CircuitBreaker("sms", failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_recipient_results_reads_status_codes():
+    response = {"SMSMessageData": {"Recipients": [
+        {"number": "+254700000001", "status": "Success", "statusCode": 101},
+        {"number": "+254700000002", "status": "InvalidPhoneNumber", "statusCode": 403},
+    ]}}
+
+    assert recipient_results(response, ["+254700000001", "+254700000002", "+254700000003"]) == {
+        "+254700000001": True,
+        "+254700000002": False,
+        "+254700000003": False,
+    }
+
+@pytest.mark.asyncio
+async def test_sdk_provider_sends_all_recipients_in_one_call():
+    sms_service = MagicMock()
+    sms_service.send_many.return_value = {"SMSMessageData": {"Recipients": [{"number": "+254700000001", "statusCode": 101}]}}
+
+    results = await AfricasTalkingSDKProvider(sms_service).send("Hello!", ["+254700000001"])
+
+    sms_service.send_many.assert_called_once_with("Hello!", ["+254700000001"])
+    assert results == {"+254700000001": True}
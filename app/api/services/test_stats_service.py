@@ -0,0 +1,75 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from app.api.services.stats_service import StatsService
+
+@pytest.fixture
+def mock_db():
+    db = MagicMock()
+    db.customer_order_stats.bulk_write = AsyncMock()
+    db.daily_sales.bulk_write = AsyncMock()
+    return db
+
+@pytest.fixture
+def stats_service(mock_db):
+    return StatsService(mock_db)
+
+def sample_order(status="pending", price=10.0):
+    return {
+        "_id": ObjectId(),
+        "customer_id": ObjectId(),
+        "item": "Pizza",
+        "price": price,
+        "status": status,
+        "created_at": datetime(2024, 10, 1, 12, 30),
+    }
+
+def written_updates(collection):
+    return [operation._doc for operation in collection.bulk_write.call_args.args[0]]
+
+
+@pytest.mark.asyncio
+async def test_record_created_increments_customer_and_day(stats_service, mock_db):
+    order = sample_order()
+
+    await stats_service.record_created([order])
+
+    customer_update = written_updates(mock_db.customer_order_stats)[0]
+    assert customer_update["$inc"] == {"order_count": 1, "total_spend": 10.0, "pending": 1}
+    daily_op = mock_db.daily_sales.bulk_write.call_args.args[0][0]
+    assert daily_op._filter == {"_id": "2024-10-01"}
+    assert daily_op._doc["$inc"] == {"order_count": 1, "revenue": 10.0, "pending": 1}
+
+@pytest.mark.asyncio
+async def test_record_updated_moves_status_and_spend(stats_service, mock_db):
+    before = sample_order(status="pending", price=10.0)
+    after = {**before, "status": "cancelled"}
+
+    await stats_service.record_updated(before, after)
+
+    assert written_updates(mock_db.customer_order_stats)[0]["$inc"] == {"total_spend": -10.0, "pending": -1, "cancelled": 1}
+
+@pytest.mark.asyncio
+async def test_record_updated_price_change(stats_service, mock_db):
+    before = sample_order(price=10.0)
+
+    await stats_service.record_updated(before, {**before, "price": 15.0})
+
+    assert written_updates(mock_db.customer_order_stats)[0]["$inc"] == {"total_spend": 5.0}
+
+@pytest.mark.asyncio
+async def test_record_deleted_reverses_contribution(stats_service, mock_db):
+    await stats_service.record_deleted(sample_order(status="completed"))
+
+    assert written_updates(mock_db.daily_sales)[0]["$inc"] == {"order_count": -1, "revenue": -10.0, "completed": -1}
+
+@pytest.mark.asyncio
+async def test_get_customer_summary_defaults_to_zero(stats_service, mock_db):
+    customer_id = str(ObjectId())
+    mock_db.customer_order_stats.find_one = AsyncMock(return_value=None)
+
+    summary = await stats_service.get_customer_summary(customer_id)
+
+    assert summary.customer_id == customer_id
+    assert summary.order_count == 0
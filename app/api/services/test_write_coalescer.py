@@ -0,0 +1,145 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from app.api.core import database
+from app.api.services.write_coalescer import WriteCoalescer
+
+def assign_ids(documents, ordered):
+    for document in documents:
+        document.setdefault("_id", ObjectId())
+
+@pytest.fixture
+def collection():
+    collection = MagicMock()
+    collection.insert_many = AsyncMock(side_effect=assign_ids)
+    return collection
+
+
+@pytest.mark.asyncio
+async def test_concurrent_inserts_share_one_insert_many(collection):
+    writer = WriteCoalescer(collection, window_ms=5, max_batch=100)
+
+    ids = await asyncio.gather(*(writer.insert({"item": f"Pizza {i}"}) for i in range(10)))
+
+    assert collection.insert_many.call_count == 1
+    assert len(set(ids)) == 10
+    assert collection.insert_many.call_args.kwargs["ordered"] is False
+
+@pytest.mark.asyncio
+async def test_full_batch_is_flushed_without_waiting_for_window(collection):
+    writer = WriteCoalescer(collection, window_ms=10_000, max_batch=2)
+
+    ids = await asyncio.wait_for(asyncio.gather(writer.insert({}), writer.insert({})), timeout=1)
+
+    assert len(ids) == 2
+
+@pytest.mark.asyncio
+async def test_each_caller_gets_its_own_error(collection):
+    def insert_many(documents, ordered):
+        assign_ids(documents, ordered)
+        raise BulkWriteError({"writeErrors": [{"index": 1, "code": 11000, "errmsg": "E11000 duplicate key"}]})
+
+    collection.insert_many = AsyncMock(side_effect=insert_many)
+    writer = WriteCoalescer(collection, window_ms=5)
+
+    results = await asyncio.gather(writer.insert({}), writer.insert({}), return_exceptions=True)
+
+    assert isinstance(results[0], ObjectId)
+    assert isinstance(results[1], DuplicateKeyError)
+
+@pytest.mark.asyncio
+async def test_close_flushes_pending_batch(collection):
+    writer = WriteCoalescer(collection, window_ms=10_000)
+
+    pending = asyncio.create_task(writer.insert({}))
+    await asyncio.sleep(0)
+    await writer.close()
+
+    assert isinstance(await pending, ObjectId)
+
+def mock_session(collection, error=None):
+    session = MagicMock()
+    session.__aenter__ = AsyncMock(return_value=session)
+    session.__aexit__ = AsyncMock(return_value=False)
+
+    async def with_transaction(callback):
+        if error is not None:
+            raise error
+        return await callback(session)
+
+    session.with_transaction = with_transaction
+    collection.database.client.start_session = AsyncMock(return_value=session)
+    return session
+
+@pytest.mark.asyncio
+async def test_after_insert_runs_in_the_same_transaction(collection):
+    session = mock_session(collection)
+    collection.insert_many = AsyncMock(side_effect=lambda documents, ordered, session=None: assign_ids(documents, ordered))
+    after_insert = AsyncMock()
+    writer = WriteCoalescer(collection, window_ms=5, max_batch=100)
+
+    ids = await asyncio.gather(*(writer.insert({"item": f"Pizza {i}"}, after_insert=after_insert) for i in range(3)))
+
+    assert collection.insert_many.call_args.kwargs["session"] is session
+    documents, hook_session = after_insert.await_args.args
+    assert [document["_id"] for document in documents] == ids
+    assert hook_session is session
+
+@pytest.mark.asyncio
+async def test_failed_transaction_fails_every_caller(collection):
+    mock_session(collection, Exception("transaction aborted"))
+    writer = WriteCoalescer(collection, window_ms=5, max_batch=100)
+
+    results = await asyncio.gather(*(writer.insert({}, after_insert=AsyncMock()) for _ in range(2)), return_exceptions=True)
+
+    assert all(str(result) == "transaction aborted" for result in results)
+
+@pytest.mark.asyncio
+async def test_write_error_in_transaction_fails_the_whole_batch(collection):
+    mock_session(collection)
+
+    def insert_many(documents, ordered, session=None):
+        assign_ids(documents, ordered)
+        raise BulkWriteError({"writeErrors": [{"index": 1, "code": 11000, "errmsg": "E11000 duplicate key"}]})
+
+    collection.insert_many = AsyncMock(side_effect=insert_many)
+    after_insert = AsyncMock()
+    writer = WriteCoalescer(collection, window_ms=5, max_batch=100)
+
+    results = await asyncio.gather(*(writer.insert({}, after_insert=after_insert) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, BulkWriteError) for result in results)
+    after_insert.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_without_transactions_hooks_run_for_inserted_documents(collection, monkeypatch):
+    monkeypatch.setattr(database, "transactions_supported", True)
+    mock_session(collection, OperationFailure("Transaction numbers are only allowed on a replica set member or mongos", 20))
+
+    def insert_many(documents, ordered, session=None):
+        assign_ids(documents, ordered)
+        raise BulkWriteError({"writeErrors": [{"index": 1, "code": 11000, "errmsg": "E11000 duplicate key"}]})
+
+    collection.insert_many = AsyncMock(side_effect=insert_many)
+    after_insert = AsyncMock()
+    writer = WriteCoalescer(collection, window_ms=5, max_batch=100)
+
+    results = await asyncio.gather(*(writer.insert({}, after_insert=after_insert) for _ in range(3)), return_exceptions=True)
+
+    assert isinstance(results[0], ObjectId) and isinstance(results[2], ObjectId)
+    assert isinstance(results[1], DuplicateKeyError)
+    documents, session = after_insert.await_args.args
+    assert [document["_id"] for document in documents] == [results[0], results[2]]
+    assert session is None
+    assert database.transactions_supported is False
+
+@pytest.mark.asyncio
+async def test_unexpected_failure_still_resolves_every_caller(collection):
+    collection.insert_many = AsyncMock(side_effect=lambda documents, ordered: None)
+    writer = WriteCoalescer(collection, window_ms=5, max_batch=100)
+
+    results = await asyncio.wait_for(asyncio.gather(writer.insert({}), writer.insert({}), return_exceptions=True), timeout=1)
+
+    assert all(isinstance(result, Exception) for result in results)
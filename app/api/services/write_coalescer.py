@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError
+
+from app.api.core.database import run_in_transaction
+
+logger = logging.getLogger(__name__)
+
+class WriteCoalescer:
+    def __init__(self, collection, window_ms: float = 3.0, max_batch: int = 100):
+        self.collection = collection
+        self.window_seconds = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending = []
+        self._timer: asyncio.TimerHandle = None
+        self._flushes = set()
+        self._closed = False
+
+    async def insert(self, document: dict, after_insert: Optional[Callable[[list, object], Awaitable]] = None):
+        if self._closed:
+            if after_insert is None:
+                result = await self.collection.insert_one(document)
+                return result.inserted_id
+
+            async def insert_one(session):
+                result = await self.collection.insert_one(document, session=session)
+                await after_insert([document], session)
+                return result.inserted_id
+
+            return await run_in_transaction(self.collection.database.client, insert_one)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((document, future, after_insert))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window_seconds, self._flush_now)
+
+        return await future
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._write(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: list):
+        documents = [document for document, _, _ in batch]
+        hooks = {}
+        for document, _, after_insert in batch:
+            if after_insert is not None:
+                hooks.setdefault(after_insert, []).append(document)
+
+        errors = None
+        sessions = []
+        try:
+            if hooks:
+                await run_in_transaction(self.collection.database.client, lambda session: self._insert_with_hooks(documents, hooks, session, sessions))
+            else:
+                await self.collection.insert_many(documents, ordered=False)
+            errors = {}
+        except BulkWriteError as e:
+            if sessions and sessions[-1] is not None:
+                errors = {index: e for index in range(len(batch))}
+            else:
+                errors = {}
+                for write_error in e.details.get("writeErrors", []):
+                    error_class = DuplicateKeyError if write_error.get("code") == 11000 else WriteError
+                    errors[write_error["index"]] = error_class(write_error.get("errmsg"), write_error.get("code"), write_error)
+        except Exception as e:
+            logger.error("Coalesced insert of %s documents into %s failed: %s", len(batch), self.collection.name, e)
+            errors = {index: e for index in range(len(batch))}
+        finally:
+            if errors is None:
+                errors = {index: RuntimeError("Coalesced insert did not complete.") for index in range(len(batch))}
+            for index, (document, future, _) in enumerate(batch):
+                if future.done():
+                    continue
+                if index in errors:
+                    future.set_exception(errors[index])
+                elif "_id" not in document:
+                    future.set_exception(RuntimeError("Coalesced insert did not complete."))
+                else:
+                    future.set_result(document["_id"])
+
+    async def _insert_with_hooks(self, documents: list, hooks: dict, session, sessions: list):
+        # Inside a transaction any write error aborts the whole batch; without one the inserted documents still need their hooks.
+        sessions.append(session)
+        try:
+            await self.collection.insert_many(documents, ordered=False, session=session)
+        except BulkWriteError as e:
+            if session is None:
+                failed = {id(documents[error["index"]]) for error in e.details.get("writeErrors", [])}
+                for after_insert, inserted in hooks.items():
+                    inserted = [document for document in inserted if id(document) not in failed]
+                    if inserted:
+                        await after_insert(inserted, None)
+            raise
+        for after_insert, inserted in hooks.items():
+            await after_insert(inserted, session)
+
+    async def close(self):
+        self._closed = True
+        self._flush_now()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
@@ -1,26 +1,68 @@
-from fastapi import APIRouter
-from app.api.models.customer_model import CustomerCreate, CustomerInDB, CustomerUpdate
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, Query, Request
+from app.api.models.customer_model import CustomerBatch, CustomerCreate, CustomerInDB, CustomerLookup, CustomerPage, CustomerSearch, CustomerUpdate
 from app.api.services.customer_service import CustomerService
-from app.api.core.database import db
+from app.api.services.bulk_service import read_bulk_rows
+from app.api.core.config import settings
+from app.api.models.report_model import CustomerOrderSummary
+from app.api.services.stats_service import StatsService
+from app.api.core.responses import BSONResponse, cache_validators, is_conditional, is_not_modified, not_modified_response
+from app.api.core.dependencies import get_customer_service, get_stats_service
 
 router = APIRouter()
 
-@router.post("/customers/", response_model=CustomerCreate)
-async def create_customer(customer: CustomerCreate):
-    service = CustomerService(db)
-    return await service.create_customer(customer.dict())
+@router.post("/customers/", response_model=CustomerInDB)
+async def create_customer(customer: CustomerCreate, service: CustomerService = Depends(get_customer_service)):
+    return BSONResponse(await service.create_customer(customer.dict()))
+
+@router.get("/customers", response_model=Union[CustomerPage, CustomerBatch])
+async def list_customers(
+    ids: Optional[str] = Query(None, description="Comma-separated customer IDs to fetch instead of a page"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    service: CustomerService = Depends(get_customer_service),
+):
+    if ids is not None:
+        return BSONResponse(await service.get_customers([customer_id for customer_id in ids.split(",") if customer_id]))
+    return BSONResponse(await service.list_customers(cursor, limit))
+
+@router.get("/customers/search", response_model=CustomerSearch)
+async def search_customers(
+    name: Optional[str] = Query(None, description="Start of the customer's full name, case-insensitive"),
+    phone: Optional[str] = Query(None, description="Phone number or its leading digits"),
+    email: Optional[str] = None,
+    q: Optional[str] = Query(None, description="Words anywhere in the customer's full name"),
+    limit: int = Query(20, ge=1, le=100),
+    service: CustomerService = Depends(get_customer_service),
+):
+    return BSONResponse(await service.search_customers(name, phone, email, q, limit))
+
+@router.post("/customers/lookup", response_model=CustomerBatch)
+async def lookup_customers(lookup: CustomerLookup, service: CustomerService = Depends(get_customer_service)):
+    return BSONResponse(await service.get_customers(lookup.ids))
+
+@router.post("/customers/bulk")
+async def bulk_create_customers(request: Request, service: CustomerService = Depends(get_customer_service)):
+    return await service.bulk_create_customers(read_bulk_rows(request), settings.bulk_chunk_size)
 
 @router.get("/customers/{customer_id}", response_model=CustomerInDB)
-async def get_customer(customer_id: str):
-    service = CustomerService(db)
-    return await service.get_customer(customer_id)
+async def get_customer(customer_id: str, request: Request, service: CustomerService = Depends(get_customer_service)):
+    if is_conditional(request):
+        validators = cache_validators(await service.get_customer_modified(customer_id))
+        if is_not_modified(request, validators):
+            return not_modified_response(validators)
+
+    customer = await service.get_customer(customer_id)
+    return BSONResponse(customer, headers=cache_validators(customer.updated_at or customer.created_at))
+
+@router.get("/customers/{customer_id}/summary", response_model=CustomerOrderSummary)
+async def get_customer_summary(customer_id: str, service: StatsService = Depends(get_stats_service)):
+    return await service.get_customer_summary(customer_id)
 
 @router.put("/customers/{customer_id}", response_model=CustomerInDB)
-async def update_customer(customer_id: str, customer_update: CustomerUpdate):
-    service = CustomerService(db)
-    return await service.update_customer(customer_id, customer_update)
+async def update_customer(customer_id: str, customer_update: CustomerUpdate, service: CustomerService = Depends(get_customer_service)):
+    return BSONResponse(await service.update_customer(customer_id, customer_update))
 
 @router.delete("/customers/{customer_id}")
-async def delete_customer(customer_id: str):
-    service = CustomerService(db)
-    return await service.delete_customer(customer_id)
\ No newline at end of file
+async def delete_customer(customer_id: str, service: CustomerService = Depends(get_customer_service)):
+    return await service.delete_customer(customer_id)
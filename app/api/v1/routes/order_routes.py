@@ -1,26 +1,105 @@
-from fastapi import APIRouter
-from app.api.models.order_model import OrderCreate, OrderInDB, OrderUpdate
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from fastapi import APIRouter, Depends, Header, Query, Request, WebSocket
+from fastapi.responses import StreamingResponse
+from app.api.models.order_model import OrderCreate, OrderInDB, OrderPage, OrderUpdate
 from app.api.services.order_service import OrderService
-from app.api.core.database import db
+from app.api.services.idempotency_service import IdempotencyService
+from app.api.services.order_events import OrderEventHub, order_event_stream, websocket_event_stream
+from app.api.services.bulk_service import read_bulk_rows
+from app.api.core.config import settings
+from app.api.core.responses import BSONResponse, cache_validators, is_conditional, is_not_modified, not_modified_response
+from app.api.core.dependencies import get_idempotency_service, get_order_events, get_order_service
 
 router = APIRouter()
 
 @router.post("/orders/", response_model=OrderInDB)
-async def create_order(order: OrderCreate):
-    service = OrderService(db)
-    return await service.create_order(order)
+async def create_order(
+    order: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, min_length=1, max_length=255),
+    service: OrderService = Depends(get_order_service),
+    idempotency: IdempotencyService = Depends(get_idempotency_service),
+):
+    if idempotency_key is None:
+        return BSONResponse(await service.create_order(order))
+    return await idempotency.execute(idempotency_key, order.model_dump(), lambda: service.create_order(order))
+
+@router.get("/orders", response_model=OrderPage)
+async def list_orders(
+    customer_id: Optional[str] = None,
+    status: Optional[str] = Query(None, pattern=r"^(pending|completed|cancelled)$"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    service: OrderService = Depends(get_order_service),
+):
+    return BSONResponse(await service.list_orders(customer_id, status, created_from, created_to, cursor, limit))
+
+@router.get("/customers/{customer_id}/orders", response_model=OrderPage)
+async def list_customer_orders(
+    customer_id: str,
+    status: Optional[str] = Query(None, pattern=r"^(pending|completed|cancelled)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    service: OrderService = Depends(get_order_service),
+):
+    return BSONResponse(await service.list_orders(customer_id, status, cursor=cursor, limit=limit))
+
+@router.get("/orders/export")
+async def export_orders(
+    format: str = Query("ndjson", pattern=r"^(ndjson|csv)$"),
+    customer_id: Optional[str] = None,
+    status: Optional[str] = Query(None, pattern=r"^(pending|completed|cancelled)$"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    service: OrderService = Depends(get_order_service),
+):
+    rows = service.export_orders(format, customer_id, status, created_from, created_to, settings.export_batch_size)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="orders.{format}"'}
+    return StreamingResponse(rows, media_type=media_type, headers=headers)
+
+@router.post("/orders/bulk")
+async def bulk_create_orders(request: Request, notify: bool = False, service: OrderService = Depends(get_order_service)):
+    return await service.bulk_create_orders(read_bulk_rows(request), settings.bulk_chunk_size, notify)
 
 @router.get("/orders/{order_id}", response_model=OrderInDB)
-async def get_order(order_id: str):
-    service = OrderService(db)
-    return await service.get_order(order_id)
+async def get_order(order_id: str, request: Request, service: OrderService = Depends(get_order_service)):
+    if is_conditional(request):
+        validators = cache_validators(await service.get_order_modified(order_id))
+        if is_not_modified(request, validators):
+            return not_modified_response(validators)
+
+    order = await service.get_order(order_id)
+    return BSONResponse(order, headers=cache_validators(service.modified_at(order)))
+
+@router.get("/orders/{order_id}/events")
+async def order_events(order_id: str, service: OrderService = Depends(get_order_service), hub: OrderEventHub = Depends(get_order_events)):
+    subscription = hub.subscribe(order_id=order_id.lower())
+    try:
+        order = await service.get_order(order_id)
+    except BaseException:
+        subscription.close()
+        raise
+
+    events = order_event_stream(subscription, order, lambda: service.get_order(order_id), settings.order_events_heartbeat_seconds)
+    return StreamingResponse(events, media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.websocket("/customers/{customer_id}/orders/events")
+async def customer_order_events(websocket: WebSocket, customer_id: str, hub: OrderEventHub = Depends(get_order_events)):
+    if not ObjectId.is_valid(customer_id):
+        await websocket.close(code=1008, reason="Invalid customer ID. Must be a valid ObjectId.")
+        return
+
+    await websocket.accept()
+    await websocket_event_stream(websocket, hub.subscribe(customer_id=customer_id.lower()))
 
 @router.put("/orders/{order_id}", response_model=OrderInDB)
-async def update_order(order_id: str, order_update: OrderUpdate):
-    service = OrderService(db)
-    return await service.update_order(order_id, order_update)
+async def update_order(order_id: str, order_update: OrderUpdate, service: OrderService = Depends(get_order_service)):
+    return BSONResponse(await service.update_order(order_id, order_update))
 
 @router.delete("/orders/{order_id}")
-async def delete_order(order_id: str):
-    service = OrderService(db)
+async def delete_order(order_id: str, service: OrderService = Depends(get_order_service)):
     return await service.delete_order(order_id)
@@ -0,0 +1,15 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from app.api.models.report_model import DailySales
+from app.api.services.stats_service import StatsService
+from app.api.core.dependencies import get_stats_service
+
+router = APIRouter()
+
+@router.get("/reports/daily", response_model=List[DailySales])
+async def get_daily_sales(
+    date_from: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    date_to: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    service: StatsService = Depends(get_stats_service),
+):
+    return await service.get_daily_sales(date_from, date_to)
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Request
+from app.api.core.responses import BSONResponse
+from app.api.core.database import pool_stats
+
+router = APIRouter()
+
+@router.get("/pool-stats")
+async def get_pool_stats():
+    return pool_stats.snapshot()
+
+@router.get("/cache-stats")
+async def get_cache_stats(request: Request):
+    cache = request.app.state.customer_service.cache
+    return {"customers": cache.stats() if cache is not None else None}
+
+@router.get("/health")
+async def health():
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def ready(request: Request):
+    status = request.app.state.admission.status()
+    status["startup"] = request.app.state.startup.status()
+    status["ready"] = status["ready"] and status["startup"]["ready"]
+    return BSONResponse(status, status_code=200 if status["ready"] else 503)
@@ -0,0 +1,48 @@
+import argparse
+import asyncio
+import random
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+def create_app(latency_ms: float = 0.0, failure_rate: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Fake SMS provider")
+    app.state.sent = []
+
+    @app.post("/version1/messaging")
+    async def send(request: Request):
+        form = await request.form()
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        if random.random() < failure_rate:
+            return JSONResponse({"error": "Service unavailable"}, status_code=503)
+
+        recipients = []
+        for number in form["to"].split(","):
+            app.state.sent.append((number, form["message"]))
+            recipients.append({
+                "number": number,
+                "status": "Success",
+                "statusCode": 101,
+                "messageId": f"ATXid_{uuid.uuid4().hex}",
+                "cost": "KES 0.8000",
+            })
+        return {"SMSMessageData": {"Message": f"Sent to {len(recipients)}/{len(recipients)}", "Recipients": recipients}}
+
+    return app
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Africa's Talking SMS API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="delay added to every send")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of sends answered with 503")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.latency_ms, args.failure_rate), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
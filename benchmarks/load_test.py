@@ -0,0 +1,223 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fake_sms_provider import create_app as create_fake_sms_provider
+
+RESULTS_DIR = Path(__file__).parent / "results"
+BASELINES_DIR = Path(__file__).parent / "baselines"
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            response = None
+            failed = True
+        self.latencies.setdefault(name, []).append(time.perf_counter() - start)
+        if failed:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        return response
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    endpoints = {}
+    for name, latencies in sorted(recorder.latencies.items()):
+        endpoints[name] = {
+            "count": len(latencies),
+            "errors": recorder.errors.get(name, 0),
+            "rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        }
+    total = sum(endpoint["count"] for endpoint in endpoints.values())
+    return {"total_requests": total, "rps": round(total / elapsed, 2), "endpoints": endpoints}
+
+class Fixtures:
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.customer_ids = []
+        self.disposable_customer_ids = []
+        self.order_ids = []
+        self.counter = 0
+
+    def next_customer(self) -> dict:
+        self.counter += 1
+        return {
+            "full_name": f"Bench Customer {self.counter}",
+            "email_address": f"bench-{self.run_id}-{self.counter}@example.com",
+            "phone_number": f"+254{700000000 + self.counter % 99999999:09d}",
+        }
+
+    async def seed(self, client: httpx.AsyncClient, customers: int, orders: int):
+        rows = [self.next_customer() for _ in range(customers * 2)]
+        response = await client.post("/api/v1/customers/bulk", json=rows)
+        response.raise_for_status()
+        ids = [row["id"] for row in response.json()["results"] if row["status"] == "inserted"]
+        self.customer_ids, self.disposable_customer_ids = ids[:customers], ids[customers:]
+
+        rows = [
+            {"item": f"Bench item {index}", "price": round(random.uniform(1, 100), 2), "customer_id": random.choice(self.customer_ids)}
+            for index in range(orders)
+        ]
+        response = await client.post("/api/v1/orders/bulk", json=rows)
+        response.raise_for_status()
+        self.order_ids = [row["id"] for row in response.json()["results"] if row["status"] == "inserted"]
+
+async def customer_crud(client, fixtures: Fixtures, recorder: Recorder):
+    await recorder.request(client, "POST /customers/", "POST", "/api/v1/customers/", json=fixtures.next_customer())
+    customer_id = random.choice(fixtures.customer_ids)
+    await recorder.request(client, "GET /customers/{customer_id}", "GET", f"/api/v1/customers/{customer_id}")
+    await recorder.request(client, "PUT /customers/{customer_id}", "PUT", f"/api/v1/customers/{customer_id}", json={"full_name": f"Bench Customer {uuid.uuid4().hex[:8]}"})
+    if fixtures.disposable_customer_ids:
+        await recorder.request(client, "DELETE /customers/{customer_id}", "DELETE", f"/api/v1/customers/{fixtures.disposable_customer_ids.pop()}")
+
+async def order_create(client, fixtures: Fixtures, recorder: Recorder):
+    order = {"item": "Bench pizza", "price": round(random.uniform(1, 100), 2), "customer_id": random.choice(fixtures.customer_ids)}
+    await recorder.request(client, "POST /orders/", "POST", "/api/v1/orders/", json=order)
+
+async def mixed(client, fixtures: Fixtures, recorder: Recorder):
+    roll = random.random()
+    if roll < 0.45:
+        await recorder.request(client, "GET /orders/{order_id}", "GET", f"/api/v1/orders/{random.choice(fixtures.order_ids)}")
+    elif roll < 0.70:
+        await recorder.request(client, "GET /customers/{customer_id}", "GET", f"/api/v1/customers/{random.choice(fixtures.customer_ids)}")
+    elif roll < 0.80:
+        await recorder.request(client, "GET /orders", "GET", "/api/v1/orders", params={"customer_id": random.choice(fixtures.customer_ids), "limit": 20})
+    elif roll < 0.92:
+        await order_create(client, fixtures, recorder)
+    else:
+        status = random.choice(["completed", "cancelled"])
+        await recorder.request(client, "PUT /orders/{order_id}", "PUT", f"/api/v1/orders/{random.choice(fixtures.order_ids)}", json={"status": status})
+
+SCENARIOS = {"customer_crud": customer_crud, "order_create": order_create, "mixed": mixed}
+
+@asynccontextmanager
+async def open_client(url: str = None):
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+            yield client
+        return
+
+    from main import app
+    from app.api.services.sms_providers import AfricasTalkingProvider
+
+    async with app.router.lifespan_context(app):
+        await app.state.sms_provider.close()
+        app.state.sms_provider = app.state.sms_dispatcher.provider = AfricasTalkingProvider(
+            "bench",
+            "bench",
+            base_url="http://fake-sms",
+            transport=httpx.ASGITransport(app=create_fake_sms_provider(latency_ms=50)),
+        )
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+            yield client
+
+async def run(scenario: str, duration: float, concurrency: int, warmup: float, customers: int, orders: int, url: str = None) -> dict:
+    fixtures = Fixtures(uuid.uuid4().hex[:12])
+    step = SCENARIOS[scenario]
+
+    async with open_client(url) as client:
+        await fixtures.seed(client, customers, orders)
+
+        async def worker(recorder: Recorder, deadline: float):
+            while time.perf_counter() < deadline:
+                await step(client, fixtures, recorder)
+
+        if warmup:
+            warmup_recorder = Recorder()
+            deadline = time.perf_counter() + warmup
+            await asyncio.gather(*(worker(warmup_recorder, deadline) for _ in range(concurrency)))
+
+        recorder = Recorder()
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(worker(recorder, deadline) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "scenario": scenario,
+        "mode": "http" if url else "asgi",
+        "concurrency": concurrency,
+        "duration_seconds": round(elapsed, 2),
+        "recorded_at": datetime.utcnow().isoformat(),
+        **summarize(recorder, elapsed),
+    }
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, expected in baseline["endpoints"].items():
+        actual = result["endpoints"].get(name)
+        if actual is None:
+            continue
+        if actual["rps"] < expected["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {actual['rps']} req/s vs baseline {expected['rps']} req/s")
+        if actual["p99_ms"] > expected["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {actual['p99_ms']}ms vs baseline {expected['p99_ms']}ms")
+    return regressions
+
+def print_report(result: dict):
+    print(f"{result['scenario']} ({result['mode']}, concurrency {result['concurrency']}): {result['rps']} req/s")
+    print(f"{'endpoint':<34}{'count':>8}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, endpoint in result["endpoints"].items():
+        print(f"{name:<34}{endpoint['count']:>8}{endpoint['errors']:>8}{endpoint['rps']:>10}{endpoint['p50_ms']:>10}{endpoint['p95_ms']:>10}{endpoint['p99_ms']:>10}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Customer Order API.")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to measure")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds to run before measuring")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--customers", type=int, default=500, help="customers to seed")
+    parser.add_argument("--orders", type=int, default=5000, help="orders to seed")
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--output", type=Path, help="where to save the JSON result")
+    parser.add_argument("--baseline", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed regression, as a fraction")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.scenario, args.duration, args.concurrency, args.warmup, args.customers, args.orders, args.url))
+    print_report(result)
+
+    output = args.output or RESULTS_DIR / f"{args.scenario}-{datetime.utcnow():%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"Saved results to {output}")
+
+    baseline = args.baseline or BASELINES_DIR / f"{args.scenario}.json"
+    if args.update_baseline:
+        baseline.parent.mkdir(parents=True, exist_ok=True)
+        baseline.write_text(json.dumps(result, indent=2))
+        print(f"Updated baseline {baseline}")
+    elif baseline.exists():
+        regressions = compare(result, json.loads(baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import json
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from app.api.core.responses import BSONResponse
+from app.api.models.customer_model import CustomerInDB
+from app.api.models.order_model import OrderInDB, OrderPage
+
+def order_document() -> dict:
+    now = datetime.utcnow()
+    return {
+        "_id": str(ObjectId()),
+        "item": "Chicken tikka pizza",
+        "price": 12.5,
+        "customer_id": str(ObjectId()),
+        "status": "pending",
+        "created_at": now,
+        "updated_at": now,
+    }
+
+def customer_document() -> dict:
+    return {
+        "_id": str(ObjectId()),
+        "full_name": "Jane Wanjiku",
+        "email_address": "jane@example.com",
+        "phone_number": "+254712345678",
+        "created_at": datetime.utcnow(),
+        "updated_at": None,
+    }
+
+def fastapi_response(model_class, document: dict) -> bytes:
+    validated = model_class(**document)
+    revalidated = model_class.model_validate(validated.model_dump())
+    return BSONResponse(jsonable_encoder(revalidated)).body
+
+def fast_response(model_class, document: dict) -> bytes:
+    return BSONResponse(model_class.model_construct(**document)).body
+
+def cases() -> dict:
+    order = order_document()
+    customer = customer_document()
+    order_model = OrderInDB(**order)
+    customer_model = CustomerInDB(**customer)
+    page = {"items": [order_document() for _ in range(100)], "next_cursor": None}
+    page_model = OrderPage(**page)
+    return {
+        "OrderInDB validate": lambda: OrderInDB(**order),
+        "OrderInDB model_dump": order_model.model_dump,
+        "OrderInDB model_dump_json": order_model.model_dump_json,
+        "CustomerInDB validate": lambda: CustomerInDB(**customer),
+        "CustomerInDB model_dump": customer_model.model_dump,
+        "CustomerInDB model_dump_json": customer_model.model_dump_json,
+        "OrderInDB response (validated)": lambda: fastapi_response(OrderInDB, order),
+        "OrderInDB response (constructed)": lambda: fast_response(OrderInDB, order),
+        "CustomerInDB response (validated)": lambda: fastapi_response(CustomerInDB, customer),
+        "CustomerInDB response (constructed)": lambda: fast_response(CustomerInDB, customer),
+        "OrderPage(100) validate": lambda: OrderPage(**page),
+        "OrderPage(100) model_dump_json": page_model.model_dump_json,
+    }
+
+def run(repeat: int) -> dict:
+    results = {}
+    for name, case in cases().items():
+        timer = timeit.Timer(case)
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=repeat, number=number)) / number
+        results[name] = {"us_per_op": round(best * 1_000_000, 3), "ops_per_sec": round(1 / best)}
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark model validation and serialization.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="where to save the JSON result")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    print(f"{'case':<34}{'us/op':>10}{'ops/s':>12}")
+    for name, result in results.items():
+        print(f"{name:<34}{result['us_per_op']:>10}{result['ops_per_sec']:>12}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps({"recorded_at": datetime.utcnow().isoformat(), "cases": results}, indent=2))
+        print(f"Saved results to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,57 @@
+import time
+
+import_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
-from app.api.v1.routes import customer_routes, order_routes
+from app.api.v1.routes import customer_routes, order_routes, report_routes, system_routes
 from app.api.core.config import settings, logger
-from app.api.core.database import initialize_database
+from app.api.core.database import connect_to_mongo, close_mongo_connection, initialize_database, pool_stats
+from app.api.core.dependencies import create_services
+from app.api.core.admission import AdmissionController, AdmissionMiddleware
+from app.api.core.metrics import REGISTRY, MetricsMiddleware
+from app.api.core.responses import BSONResponse
+from app.api.core.startup import FirstRequestMiddleware, StartupTracker
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    mongodb_client = AsyncIOMotorClient(settings.mongodb_url)
-    app.mongodb = mongodb_client[settings.mongodb_db]
+    db = connect_to_mongo()
     logger.info("Connected to MongoDB!")
 
-    await initialize_database()
+    startup = app.state.startup
+    if settings.index_build_in_background:
+        startup.build_indexes_in_background(lambda: initialize_database(db), settings.index_build_retry_seconds)
+    else:
+        await startup.build_indexes(lambda: initialize_database(db), settings.index_build_retry_seconds)
+    create_services(app, db)
+    app.state.customer_service.start_search_backfill()
+    app.state.admission.lag_monitor.start()
+    app.state.sms_dispatcher.start()
+    app.state.outbox_service.start()
+    if app.state.customer_cache_invalidator is not None:
+        app.state.customer_cache_invalidator.start()
+    if app.state.order_archiver is not None:
+        app.state.order_archiver.start()
+    startup.mark("startup")
     yield
 
-    await mongodb_client.close()
+    await startup.stop()
+    await app.state.admission.lag_monitor.stop()
+    await app.state.order_events.stop()
+    if app.state.order_archiver is not None:
+        await app.state.order_archiver.stop()
+    if app.state.order_writer is not None:
+        await app.state.order_writer.close()
+    if app.state.customer_cache_invalidator is not None:
+        await app.state.customer_cache_invalidator.stop()
+    await app.state.customer_service.close()
+    await app.state.outbox_service.stop()
+    await app.state.sms_dispatcher.stop(timeout=settings.sms_drain_timeout_seconds)
+    await app.state.outbox_service.flush_results()
+    await app.state.sms_provider.close()
+    close_mongo_connection()
     logger.info("Closed MongoDB connection!")
 
 app = FastAPI(
@@ -23,6 +59,7 @@ app = FastAPI(
     description="A simple API for managing customers and orders",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=BSONResponse,
 )
 
 origins = [
@@ -30,6 +67,22 @@ origins = [
     "http://localhost:8000",
     "http://127.0.0.1:8000"
 ]
+app.state.admission = AdmissionController(
+    read_limit=settings.admission_read_limit,
+    write_limit=settings.admission_write_limit,
+    order_create_limit=settings.admission_order_create_limit,
+    max_queue_wait_ms=settings.admission_max_queue_wait_ms,
+    max_loop_lag_ms=settings.admission_max_loop_lag_ms,
+    max_pool_waiters=settings.admission_max_pool_waiters,
+    retry_after_seconds=settings.admission_retry_after_seconds,
+    unready_after_seconds=settings.admission_unready_after_seconds,
+    pool_waiters=pool_stats.waiting,
+)
+app.add_middleware(AdmissionMiddleware, controller=app.state.admission)
+app.add_middleware(MetricsMiddleware)
+app.state.startup = StartupTracker(import_started)
+app.add_middleware(FirstRequestMiddleware, tracker=app.state.startup)
+# Added last so it is outermost and 503s from admission control still carry CORS headers.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -40,6 +93,8 @@ app.add_middleware(
 
 app.include_router(customer_routes.router, prefix="/api/v1")
 app.include_router(order_routes.router, prefix="/api/v1")
+app.include_router(report_routes.router, prefix="/api/v1")
+app.include_router(system_routes.router, prefix="/api/v1")
 
 @app.get("/")
 async def root():
@@ -47,3 +102,9 @@ async def root():
         "message": "Welcome to the Customer Order API",
         "explore": "Navigate to {root_url}/docs#/ to explore the API documentation"
     }
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+app.state.startup.mark("import")
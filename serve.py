@@ -0,0 +1,73 @@
+import math
+import os
+
+import uvicorn
+
+from app.api.core.config import settings, logger
+
+CGROUP_V2_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+CGROUP_V1_CPU_QUOTA = "/sys/fs/cgroup/cpu/cpu.cfs_quota_us"
+CGROUP_V1_CPU_PERIOD = "/sys/fs/cgroup/cpu/cpu.cfs_period_us"
+
+def _read(path: str):
+    try:
+        with open(path) as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+def cgroup_cpu_limit(cpu_max: str = CGROUP_V2_CPU_MAX, quota: str = CGROUP_V1_CPU_QUOTA, period: str = CGROUP_V1_CPU_PERIOD):
+    value = _read(cpu_max)
+    if value is not None:
+        limit, _, interval = value.partition(" ")
+        if limit == "max":
+            return None
+        return int(limit) / int(interval or 100000)
+
+    limit, interval = _read(quota), _read(period)
+    if limit is None or interval is None or int(limit) <= 0:
+        return None
+    return int(limit) / int(interval)
+
+def available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
+
+def worker_count() -> int:
+    if settings.web_concurrency > 0:
+        return settings.web_concurrency
+    return available_cpus()
+
+def worker_pool_size(workers: int) -> int:
+    if settings.mongodb_connection_budget <= 0:
+        return settings.mongodb_max_pool_size
+    return max(1, settings.mongodb_connection_budget // workers)
+
+def main():
+    workers = worker_count()
+    pool_size = worker_pool_size(workers)
+
+    # Spawned workers re-import the app and build their own Motor client from these settings.
+    os.environ["MONGODB_MAX_POOL_SIZE"] = str(pool_size)
+    os.environ["MONGODB_MIN_POOL_SIZE"] = str(min(settings.mongodb_min_pool_size, pool_size))
+
+    logger.info("Starting %s workers on %s:%s with up to %s MongoDB connections each", workers, settings.host, settings.port, pool_size)
+    uvicorn.run(
+        "main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        timeout_graceful_shutdown=settings.graceful_shutdown_seconds,
+    )
+
+if __name__ == "__main__":
+    main()
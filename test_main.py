@@ -10,4 +10,38 @@ def test_read_main():
     assert response.json() == {
         "message": "Welcome to the Customer Order API",
         "explore": "Navigate to {root_url}/docs#/ to explore the API documentation"
-    }
\ No newline at end of file
+    }
+
+def test_read_pool_stats():
+    response = client.get("/api/v1/pool-stats")
+    assert response.status_code == 200
+    assert "max_pool_size" in response.json()
+    assert "servers" in response.json()
+
+
+def test_metrics_record_route_templates():
+    client.get("/")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert 'http_requests_total{method="GET",route="/",status="200"}' in response.text
+
+def test_health_and_readiness():
+    assert client.get("/api/v1/health").json() == {"status": "ok"}
+
+    response = client.get("/api/v1/ready")
+    assert response.status_code == 503
+    assert response.json()["startup"]["indexes"] == "pending"
+    assert set(response.json()["groups"]) == {"reads", "writes", "order_create"}
+
+    startup = app.state.startup
+    startup.indexes = "ready"
+    startup.mark("startup")
+    try:
+        response = client.get("/api/v1/ready")
+    finally:
+        startup.indexes = "pending"
+        startup.phases.pop("startup")
+
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
+    assert "import" in response.json()["startup"]["phases"]
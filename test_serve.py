@@ -0,0 +1,44 @@
+import serve
+from app.api.core.config import settings
+
+def test_cgroup_v2_quota_is_read(tmp_path):
+    cpu_max = tmp_path / "cpu.max"
+    cpu_max.write_text("250000 100000\n")
+
+    assert serve.cgroup_cpu_limit(cpu_max=str(cpu_max)) == 2.5
+
+def test_unlimited_cgroup_has_no_limit(tmp_path):
+    cpu_max = tmp_path / "cpu.max"
+    cpu_max.write_text("max 100000\n")
+
+    assert serve.cgroup_cpu_limit(cpu_max=str(cpu_max)) is None
+
+def test_cgroup_v1_quota_is_read(tmp_path):
+    quota, period = tmp_path / "quota", tmp_path / "period"
+    quota.write_text("-1")
+    period.write_text("100000")
+    missing = str(tmp_path / "cpu.max")
+
+    assert serve.cgroup_cpu_limit(cpu_max=missing, quota=str(quota), period=str(period)) is None
+
+    quota.write_text("150000")
+    assert serve.cgroup_cpu_limit(cpu_max=missing, quota=str(quota), period=str(period)) == 1.5
+
+def test_workers_follow_cgroup_limit(monkeypatch):
+    monkeypatch.setattr(serve.os, "sched_getaffinity", lambda pid: set(range(8)), raising=False)
+    monkeypatch.setattr(serve, "cgroup_cpu_limit", lambda: 2.5)
+    monkeypatch.setattr(settings, "web_concurrency", 0)
+
+    assert serve.worker_count() == 3
+
+    monkeypatch.setattr(settings, "web_concurrency", 5)
+    assert serve.worker_count() == 5
+
+def test_connection_budget_is_shared_between_workers(monkeypatch):
+    monkeypatch.setattr(settings, "mongodb_max_pool_size", 100)
+    monkeypatch.setattr(settings, "mongodb_connection_budget", 0)
+    assert serve.worker_pool_size(4) == 100
+
+    monkeypatch.setattr(settings, "mongodb_connection_budget", 50)
+    assert serve.worker_pool_size(4) == 12
+    assert serve.worker_pool_size(64) == 1